@@ -0,0 +1,245 @@
+"""
+Headless batch pipeline: python -m can_relax <files|dirs|globs> -o results.csv
+
+Runs parse -> fit -> kinetics -> mastercurve on every wide-format export and
+writes one consolidated results table. Only core modules are imported, so this
+works on machines without streamlit, plotly or matplotlib.
+"""
+
+import argparse
+import glob
+import logging
+import os
+import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+
+import numpy as np
+import pandas as pd
+
+from can_relax import __version__
+from can_relax.io.ingest import ingest_files
+from can_relax.io.parser import parse_wide_format_data
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.result_cache import ResultCache
+from can_relax.core.kinetics import KineticsEngine
+from can_relax.core.tts import TTSEngine, characteristic_tau
+
+logger = logging.getLogger("CLI")
+
+SUPPORTED_SUFFIXES = ('.csv', '.txt', '.xlsx')
+MODEL_CHOICES = ['Maxwell', 'Single_KWW', 'Dual_KWW']
+
+
+def expand_inputs(inputs):
+    """Resolves files, directories and glob patterns into a sorted, de-duplicated file list."""
+    files = set()
+    for item in inputs:
+        path = pathlib.Path(item)
+        if path.is_dir():
+            candidates = path.iterdir()
+        elif glob.has_magic(item):
+            candidates = (pathlib.Path(p) for p in glob.glob(item, recursive=True))
+        else:
+            candidates = [path]
+        for c in candidates:
+            if c.is_file() and c.suffix.lower() in SUPPORTED_SUFFIXES:
+                files.add(str(c))
+    return sorted(files)
+
+
+def analyze_file(file_path, Tg=None, fit_model=None, ref_temp=None, cache=None, min_quality=None, adaptive=False,
+                 multistart=False, varpro=False, free_g0=False, weighting='uniform', n_boot=0, stream=False):
+    """
+    Runs the full pipeline on one file (see analyze_curves for the options).
+    stream decimates long text logs while parsing (bounded memory, bin-averaged curves).
+    """
+    curves = parse_wide_format_data(file_path, stream=stream)
+    return analyze_curves(os.path.basename(file_path), curves, Tg=Tg, fit_model=fit_model, ref_temp=ref_temp,
+                          cache=cache, min_quality=min_quality, adaptive=adaptive, multistart=multistart,
+                          varpro=varpro, free_g0=free_g0, weighting=weighting, n_boot=n_boot)
+
+
+def analyze_curves(name, curves, Tg=None, fit_model=None, ref_temp=None, cache=None, min_quality=None, adaptive=False,
+                   multistart=False, varpro=False, free_g0=False, weighting='uniform', n_boot=0):
+    """
+    Runs fit -> kinetics -> mastercurve on the parsed curves of one file (name is its file name).
+    Returns a list of row dicts (one per temperature) for the consolidated table.
+    cache is an optional ResultCache; curves fitted in earlier runs are not refitted.
+    min_quality rejects curves whose signal-quality score is lower before fitting.
+    adaptive fits Dual KWW only where the cheaper models leave a second mode unexplained.
+    multistart fits Dual KWW from many starting points instead of one.
+    varpro fits Dual KWW by variable projection; free_g0 then also fits the G0 scale.
+    weighting selects the fitted residuals ('uniform', 'relative' or 'log').
+    n_boot > 0 adds bootstrap confidence intervals (95%) for tau and Ea.
+    """
+    if not curves:
+        return [{'File': name, 'Valid': False, 'Reason': 'Parsing failed (no Temp/Time/Modulus columns)'}]
+
+    analyzer = CurveAnalyzer(cache=cache, min_quality=min_quality, adaptive=adaptive,
+                             multistart=multistart, varpro=varpro, free_g0=free_g0, weighting=weighting)
+    results = analyzer.fit_all(curves, Tg=Tg, fit_model=fit_model, workers=1)
+    if n_boot > 0:
+        analyzer.bootstrap(results, n_boot=n_boot, workers=1)
+    valid = [r for r in results if r['Valid']]
+
+    # Kinetics use the characteristic tau of each valid fit
+    kin_temps, kin_taus, tau_samples = [], [], []
+    for r in valid:
+        tau = characteristic_tau(r)
+        if np.isfinite(tau) and tau > 0:
+            kin_temps.append(r['Temp'])
+            kin_taus.append(tau)
+            if 'Bootstrap' in r:
+                tau_samples.append(r['Bootstrap']['Tau_Samples'])
+
+    kinetics = KineticsEngine()
+    arr = kinetics.fit_arrhenius(kin_temps, kin_taus)
+    vft = kinetics.fit_vft(kin_temps, kin_taus)
+    # Only when every kinetics point has bootstrap samples
+    arr_boot = kinetics.arrhenius_bootstrap(kin_temps, tau_samples) if len(tau_samples) == len(kin_temps) else None
+    master = TTSEngine().generate_mastercurve(valid, ref_temp=ref_temp) if valid else None
+
+    summary = {
+        'Ea_kJmol': arr['Ea'] if arr else np.nan,
+        'Ea_std_kJmol': arr['Ea_std'] if arr else np.nan,
+        'Arrhenius_R2': arr['R2'] if arr else np.nan,
+        'VFT_A': vft['Params']['A'] if vft else np.nan,
+        'VFT_B': vft['Params']['B'] if vft else np.nan,
+        'VFT_T0_K': vft['Params']['T0'] if vft else np.nan,
+        'VFT_R2': vft['R2'] if vft else np.nan,
+        'T_ref': master['T_ref'] if master else np.nan,
+    }
+    if n_boot > 0:
+        summary.update({
+            'Ea_CI_low_kJmol': arr_boot['Ea_CI'][0] if arr_boot else np.nan,
+            'Ea_CI_high_kJmol': arr_boot['Ea_CI'][1] if arr_boot else np.nan,
+        })
+
+    rows = []
+    for r in results:
+        row = {'File': name, 'Temp': r['Temp'], 'Valid': r['Valid'], 'Reason': r.get('Reason', '')}
+        if r['Valid']:
+            best = r['Best_Model']
+            fit = r['Fits'][best]
+            tau = characteristic_tau(r)
+            row.update({
+                'Best_Model': best,
+                'Tau_s': tau,
+                'R2': fit['r2'],
+                'AICc': fit['aic'],
+                'Params': ' '.join(f"{p:.6g}" for p in fit['popt']),
+                'Param_Errors': ' '.join(f"{p:.3g}" for p in fit.get('perr', np.full(len(fit['popt']), np.nan))),
+                'Quality': r['Quality'],
+                'G0': r['Raw']['G0'],
+                'Shift_aT': master['Shifts'].get(r['Temp'], np.nan) if master else np.nan,
+            })
+            if n_boot > 0:
+                boot = r.get('Bootstrap')
+                row.update({
+                    'Tau_CI_low': boot['Tau_CI'][0] if boot else np.nan,
+                    'Tau_CI_high': boot['Tau_CI'][1] if boot else np.nan,
+                })
+        row.update(summary)
+        rows.append(row)
+    return rows
+
+
+def _analyze_curves_safely(name, curves, Tg, fit_model, ref_temp, cache=None, min_quality=None, adaptive=False,
+                           multistart=False, varpro=False, free_g0=False, weighting='uniform', n_boot=0):
+    # One bad export must not abort an overnight run
+    try:
+        return analyze_curves(name, curves, Tg=Tg, fit_model=fit_model, ref_temp=ref_temp, cache=cache,
+                              min_quality=min_quality, adaptive=adaptive, multistart=multistart, varpro=varpro,
+                              free_g0=free_g0, weighting=weighting, n_boot=n_boot)
+    except Exception as e:
+        return [{'File': name, 'Valid': False, 'Reason': f'Pipeline error: {e}'}]
+
+
+def run_batch(files, Tg=None, fit_model=None, ref_temp=None, workers=None, cache=None, min_quality=None, adaptive=False,
+              multistart=False, varpro=False, free_g0=False, weighting='uniform', n_boot=0, stream=False):
+    """
+    Analyzes many files and returns the consolidated DataFrame in input order.
+    All files are parsed first with ingest_files (on processes when workers>1, else on
+    the shared ingestion thread pool); the parsed curves are then fitted on a process
+    pool, one file per task. Falls back to serial fitting when workers<=1 or the pool
+    cannot be used.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(files))
+    n = len(files)
+
+    names = [os.path.basename(f) for f in files]
+    curve_sets = list(ingest_files(files, names=names, use_processes=workers > 1, workers=workers,
+                                   stream=stream).values())
+
+    rows = None
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                rows = list(pool.map(_analyze_curves_safely, names, curve_sets, [Tg] * n, [fit_model] * n, [ref_temp] * n, [cache] * n,
+                                     [min_quality] * n, [adaptive] * n, [multistart] * n,
+                                     [varpro] * n, [free_g0] * n, [weighting] * n, [n_boot] * n))
+        except (BrokenProcessPool, PicklingError, OSError):
+            rows = None
+    if rows is None:
+        rows = [_analyze_curves_safely(name, curves, Tg, fit_model, ref_temp, cache, min_quality, adaptive,
+                                       multistart, varpro, free_g0, weighting, n_boot)
+                for name, curves in zip(names, curve_sets)]
+
+    return pd.DataFrame([row for file_rows in rows for row in file_rows])
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m can_relax",
+        description="Batch stress-relaxation analysis of wide-format CSV/XLSX exports.")
+    parser.add_argument('inputs', nargs='+', help="Files, directories or glob patterns")
+    parser.add_argument('-o', '--output', default='can_relax_results.csv', help="Consolidated results table (.csv or .xlsx)")
+    parser.add_argument('--tg', type=float, default=None, help="Tg (°C); curves below it are skipped")
+    parser.add_argument('--model', choices=MODEL_CHOICES, default=None, help="Fit only this model (default: all, best by AICc)")
+    parser.add_argument('--ref-temp', type=float, default=None, help="Mastercurve reference temperature (°C)")
+    parser.add_argument('--min-quality', type=float, default=None, help="Skip curves whose signal-quality score (0-1) is below this")
+    parser.add_argument('--adaptive', action='store_true', help="Fit Dual KWW only where the spectrum or Single KWW residuals suggest a second mode")
+    parser.add_argument('--multistart', action='store_true', help="Fit Dual KWW from many Latin-hypercube starts (slower, avoids local minima)")
+    parser.add_argument('--varpro', action='store_true', help="Fit Dual KWW by variable projection (amplitude solved in closed form)")
+    parser.add_argument('--free-g0', action='store_true', help="With --varpro, fit the G0 scale instead of fixing it at the trimmed peak")
+    parser.add_argument('--weighting', choices=('uniform', 'relative', 'log'), default='uniform', help="Residuals to minimize: plain, relative to G, or of ln G (weights the long-time tail)")
+    parser.add_argument('--bootstrap', type=int, default=0, metavar='N', help="Add 95%% bootstrap intervals for tau and Ea from N refits per curve (default: off)")
+    parser.add_argument('--stream', action='store_true', help="Read CSV/TXT exports in chunks and log-bin average each curve (bounded memory for very long logs)")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="Worker processes across files (default: CPU count)")
+    parser.add_argument('--cache-dir', default=None, help="Fit result cache directory (default: $CAN_RELAX_CACHE_DIR or ~/.cache/can_relax)")
+    parser.add_argument('--no-cache', action='store_true', help="Refit every curve without reading or writing the result cache")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Show parser progress messages")
+    parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
+    return parser
+
+
+def main(argv=None):
+    args = build_arg_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("No CSV/XLSX files found.", file=sys.stderr)
+        return 1
+
+    cache = None
+    if not args.no_cache:
+        cache = ResultCache(pathlib.Path(args.cache_dir) / 'results.sqlite' if args.cache_dir else None)
+
+    table = run_batch(files, Tg=args.tg, fit_model=args.model, ref_temp=args.ref_temp,
+                      workers=args.workers, cache=cache, min_quality=args.min_quality, adaptive=args.adaptive,
+                      multistart=args.multistart, varpro=args.varpro, free_g0=args.free_g0,
+                      weighting=args.weighting, n_boot=args.bootstrap, stream=args.stream)
+    if args.output.lower().endswith('.xlsx'):
+        table.to_excel(args.output, index=False)
+    else:
+        table.to_csv(args.output, index=False)
+
+    n_valid = int(table['Valid'].sum()) if 'Valid' in table else 0
+    print(f"Processed {len(files)} files, {n_valid} valid curves -> {args.output}")
+    return 0
@@ -1,13 +1,78 @@
+import logging
+import os
 import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
 from scipy.optimize import curve_fit
-from typing import Dict, Any, Tuple, Optional
-from can_relax.core.models import Maxwell, SingleKWW, DualKWW
+from typing import Dict, Any, List, Mapping, Tuple, Optional
+from can_relax.core.models import Maxwell, SingleKWW, DualKWW, LogResiduals, WEIGHTINGS, residual_sigma
 from can_relax.core.processing import DataProcessor
 from can_relax.core.auto_engine import AutoEngine
+from can_relax.core.spectrum import spectrum_peaks
+from can_relax.core.initial_guess import PEAK_FRACTION, coarse_spectrum
+from can_relax.core.batch_fit import batched_least_squares, pad_curves
+from can_relax.core.multistart import multistart_fit
+from can_relax.core.varpro import varpro_dual_kww
+from can_relax.core.bootstrap import bootstrap_fit, summarize
+from can_relax.core.tts import TAU_INDEX
+from can_relax.core.result_cache import ResultCache
+from can_relax.core.fingerprint import curve_fingerprint, fingerprint_arrays
+
+logger = logging.getLogger("Analyzer")
 
 class CurveAnalyzer:
-    def __init__(self) -> None:
+    # Function-evaluation budget for the single-curve TRF fits
+    MAXFEV = {'Maxwell': 5000, 'Single_KWW': 5000, 'Dual_KWW': 10000}
+    # Iteration budget for the batched Levenberg-Marquardt solve in fit_many
+    BATCH_MAX_ITER = 200
+    # Each model reduces to its nested model at a parameter boundary (beta=1, A=0/1)
+    NESTED_MODELS = {'Single_KWW': 'Maxwell', 'Dual_KWW': 'Single_KWW'}
+    # Adaptive selection: Dual KWW is only attempted when the cheap fits and the spectrum
+    # suggest a second mode (see _dual_kww_gate)
+    ADAPTIVE_MIN_QUALITY = 0.5
+    ADAPTIVE_MISFIT = 0.02
+    # Multi-start mode: Latin-hypercube starts scored at once, best TOP_K refined by TRF,
+    # stopping once two refinements agree to RTOL in sum of squares
+    MULTISTART_MODELS = ('Dual_KWW',)
+    MULTISTART_STARTS = 64
+    MULTISTART_TOP_K = 5
+    MULTISTART_RTOL = 1e-4
+    # Bootstrap intervals are withheld when fewer replicates than this fraction converge
+    BOOTSTRAP_MIN_CONVERGED = 0.9
+
+    def __init__(self, cache: Optional[ResultCache] = None, min_quality: Optional[float] = None,
+                 adaptive: bool = False, multistart: bool = False, varpro: bool = False,
+                 free_g0: bool = False, weighting: str = 'uniform') -> None:
+        """
+        cache: optional persistent ResultCache; fit results are looked up by a digest of
+               the raw curve and every setting that affects the fit.
+        min_quality: curves whose signal-quality score (0-1) falls below this are rejected
+               before any fitting; None fits every curve that survives trimming.
+        adaptive: with fit_model=None, fit Maxwell and Single KWW first and attempt Dual KWW
+               only when it looks warranted; skipped fits are listed in result['Skipped_Fits'].
+        multistart: fit Dual KWW from many starts (see multistart_fit) instead of one initial
+               guess; slower, but robust against local minima.
+        varpro: fit Dual KWW by variable projection (A solved in closed form, see varpro_dual_kww),
+               falling back to the bounded fit when the projected amplitudes turn negative.
+        free_g0: with varpro, also fit the amplitude scale instead of fixing G(0)=1 at the
+               trimmed peak; the fitted factor is stored as the fit entry's 'G0_scale'.
+        weighting: residuals the fits minimize: 'uniform' (g - model), 'relative' ((g - model)/g),
+               'log' (ln g - ln model) or 'sigma' ((g - model)/sigma, with per-point standard
+               deviations from an optional 'Sigma' column of each curve, in Modulus units;
+               curves without one are fitted unweighted, with a logged warning). R², AICc and
+               BIC stay unweighted.
+        """
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"weighting must be one of {WEIGHTINGS}, got {weighting!r}")
+        self.cache = cache
+        self.min_quality = min_quality
+        self.adaptive = adaptive
+        self.multistart = multistart
+        self.varpro = varpro
+        self.free_g0 = free_g0
+        self.weighting = weighting
         self.processor = DataProcessor()
         self.auto = AutoEngine()
         self.models = {
@@ -30,10 +95,11 @@ class CurveAnalyzer:
         bic = n_params * np.log(n) + n * np.log(rss/n)
         return float(r2), float(aicc), float(bic)
 
-    def fit_one_temp(self, temp: float, df_raw: pd.DataFrame, Tg: Optional[float] = None, fit_model: Optional[str] = None) -> Dict[str, Any]:
+    def _prepare_curve(self, temp: float, df_raw: pd.DataFrame, Tg: Optional[float], score: bool = True) -> Dict[str, Any]:
         """
-        Runs analysis for one temperature.
-        If Tg is provided and temp < Tg, returns a 'Frozen' status.
+        Physics barrier, trimming and quality scoring shared by the single and batched fit paths.
+        Returns a result dict; only results with Valid=True carry 'Raw' data to fit.
+        score=False leaves quality scoring to a later _apply_quality call over many curves.
         """
         # --- PHYSICS BARRIER CHECK ---
         if Tg is not None:
@@ -49,66 +115,232 @@ class CurveAnalyzer:
         g_raw = df_raw['Modulus'].values
         
         # 1. Processing
-        t, g, G0 = self.processor.trim_curve(t_raw, g_raw)
+        t, g, G0, shift = self.processor.trim_curve_with_shift(t_raw, g_raw)
         if t is None: 
             return {'Temp': temp, 'Valid': False, 'Reason': 'Data Quality (Too short/noisy)'}
 
         result = {
             'Temp': temp,
             'Valid': True,
-            'Raw': {'t': t, 'g': g, 'G0': G0},
+            'Raw': {'t': t, 'g': g, 'G0': G0, 'fingerprint': fingerprint_arrays(t, g)},
             'Fits': {}
         }
+        if self.weighting == 'sigma':
+            if self._has_sigma(df_raw):
+                result['Raw']['sigma'] = self._trimmed_sigma(df_raw, t, G0, shift)
+            else:
+                logger.warning("Curve at %s°C has no 'Sigma' column; fitting it unweighted", temp)
         
         # 2. Quality Check
-        quality = self.auto.compute_signal_quality(t, g)
-        result['Quality'] = quality
+        if score:
+            self._apply_quality([result])
+        return result
+
+    @staticmethod
+    def _has_sigma(df_raw: pd.DataFrame) -> bool:
+        return 'Sigma' in df_raw and bool(np.isfinite(df_raw['Sigma'].to_numpy(dtype=float)).any())
 
-        # 3. Fit Models
+    def _trimmed_sigma(self, df_raw: pd.DataFrame, t: np.ndarray, G0: float, shift: float) -> np.ndarray:
+        """
+        Maps the raw 'Sigma' column onto the trimmed, normalized curve (interpolated in time);
+        shift is the time shift trim_curve_with_shift applied (raw time = t + shift).
+        """
+        t_raw = df_raw['Time'].to_numpy(dtype=float)
+        s_raw = df_raw['Sigma'].to_numpy(dtype=float)
+        ok = np.isfinite(t_raw) & np.isfinite(s_raw)
+        order = np.argsort(t_raw[ok])
+        return np.interp(t + shift, t_raw[ok][order], s_raw[ok][order]) / G0
+
+    def _apply_quality(self, results: List[Dict[str, Any]]) -> None:
+        """
+        Scores all valid results in one vectorized pass and, if min_quality is set,
+        rejects the low-quality ones so they are never fitted.
+        """
+        valid = [r for r in results if r['Valid']]
+        if not valid:
+            return
+        scores = self.auto.score_curves([(r['Raw']['t'], r['Raw']['g']) for r in valid])
+        for i, r in enumerate(valid):
+            q = float(scores['quality'][i])
+            r['Quality'] = q
+            r['Quality_Components'] = {k: float(scores[k][i]) for k in ('noise', 'range', 'wiggle')}
+            if self.min_quality is not None and q < self.min_quality:
+                r['Valid'] = False
+                r['Reason'] = f"Low signal quality ({q:.0%} < {self.min_quality:.0%})"
+                r['Auto_Explanation'] = (f"Curve at {r['Temp']}°C was not fitted: signal quality {q:.0%} "
+                                         f"(noise {r['Quality_Components']['noise']:.0%}, range {r['Quality_Components']['range']:.0%}, "
+                                         f"wiggle {r['Quality_Components']['wiggle']:.0%}) is below the {self.min_quality:.0%} threshold.")
+                r.pop('Fits', None)
+
+    def _models_to_fit(self, fit_model: Optional[str]) -> List[str]:
         # Only fit the specified model (or all if fit_model is None)
-        models_to_fit = [fit_model] if fit_model is not None else ['Maxwell', 'Single_KWW', 'Dual_KWW']
+        return [fit_model] if fit_model is not None else ['Single_KWW', 'Maxwell', 'Dual_KWW']
 
-        # Single KWW
-        if 'Single_KWW' in models_to_fit:
-            model_s = self.models['Single_KWW']
-            try:
-                popt_s, _ = curve_fit(model_s.func, t, g, p0=model_s.get_initial_guess(t, g), bounds=model_s.get_bounds(), maxfev=5000)
-                pred_s = model_s.func(t, *popt_s)
-                r2_s, aic_s, bic_s = self._calculate_metrics(g, pred_s, 2)  # 2 params: tau, beta
-                result['Fits']['Single_KWW'] = {'popt': popt_s, 'r2': r2_s, 'aic': aic_s, 'bic': bic_s, 'curve': pred_s}
-            except Exception:
-                result['Fits']['Single_KWW'] = {'r2': 0, 'aic': np.inf, 'bic': np.inf, 'curve': g, 'popt': [np.nan, np.nan]}
+    def _is_gated(self, name: str, fit_model: Optional[str]) -> bool:
+        return self.adaptive and fit_model is None and name == 'Dual_KWW'
 
-        # Maxwell
-        if 'Maxwell' in models_to_fit:
-            model_m = self.models['Maxwell']
-            try:
-                popt_m, _ = curve_fit(model_m.func, t, g, p0=model_m.get_initial_guess(t, g), bounds=model_m.get_bounds(), maxfev=5000)
-                pred_m = model_m.func(t, *popt_m)
-                r2_m, aic_m, bic_m = self._calculate_metrics(g, pred_m, 1)  # 1 param: tau
-                result['Fits']['Maxwell'] = {'popt': popt_m, 'r2': r2_m, 'aic': aic_m, 'bic': bic_m, 'curve': pred_m}
-            except Exception:
-                result['Fits']['Maxwell'] = {'r2': 0, 'aic': np.inf, 'bic': np.inf, 'curve': g, 'popt': [np.nan]}
+    def _dual_kww_gate(self, result: Dict[str, Any]) -> Optional[str]:
+        """
+        Decides whether Dual KWW is worth fitting after the cheap models.
+        Returns None to fit it, or the reason for skipping. Dual KWW is skipped when the
+        signal is too noisy to resolve two modes, or when the spectrum is unimodal and the
+        Single KWW residuals show no systematic misfit beyond the noise.
+        Diagnostics are stored in result['Model_Selection'], together with the coarse spectrum
+        (initial_guess.coarse_spectrum) so the Dual KWW initial guess can reuse it.
+        """
+        quality = result['Quality']
+        if quality < self.ADAPTIVE_MIN_QUALITY:
+            return f"signal quality {quality:.0%} is too low to resolve two modes"
+
+        base = result['Fits'].get('Single_KWW') or result['Fits'].get('Maxwell')
+        if base is None or not np.isfinite(base['aic']):
+            return None
+        t, g = result['Raw']['t'], result['Raw']['g']
+        res = g - base['curve']
+        # Systematic misfit: largest excursion of the moving-averaged residuals,
+        # compared with what averaged noise alone would produce
+        w = max(3, min(15, (len(res) // 10) | 1))
+        misfit = float(np.max(np.abs(np.convolve(res, np.ones(w) / w, mode='valid'))))
+        sigma = float(np.std(np.diff(res)) / np.sqrt(2))
+        misfit_limit = max(self.ADAPTIVE_MISFIT, float(4 * sigma / np.sqrt(w)))
+        spectrum = coarse_spectrum(t, g)
+        peaks = None if spectrum is None else len(spectrum_peaks(spectrum[1], PEAK_FRACTION))
+        result['Model_Selection'] = {'misfit': misfit, 'misfit_limit': misfit_limit, 'spectrum_peaks': peaks,
+                                     'spectrum': spectrum}
+
+        if peaks is None or peaks >= 2 or misfit > misfit_limit:
+            return None
+        return f"unimodal spectrum and Single KWW residuals within noise (misfit {misfit:.3f} <= {misfit_limit:.3f})"
+
+    def _skip_fit(self, result: Dict[str, Any], name: str, reason: str) -> None:
+        result.setdefault('Skipped_Fits', {})[name] = reason
+
+    def _covariance(self, name: str, t: np.ndarray, g: np.ndarray, popt: np.ndarray,
+                    sigma: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Parameter covariance s^2 (J^T J)^-1 at popt, in the weighted residuals the fit minimized
+        (the same estimate curve_fit returns). All-NaN without degrees of freedom.
+        """
+        fit_model, t_fit, y, s = self._fit_problem(name, t, g, sigma)
+        J = np.asarray(fit_model.jac(t_fit, *popt), dtype=float)
+        r = fit_model.func(t_fit, *popt) - y
+        if s is not None:
+            J = J / s[:, None]
+            r = r / s
+        dof = len(r) - len(popt)
+        if dof <= 0 or not (np.all(np.isfinite(J)) and np.all(np.isfinite(r))):
+            return np.full((len(popt), len(popt)), np.nan)
+        return np.linalg.pinv(J.T @ J) * float(r @ r) / dof
+
+    def _fit_entry(self, name: str, t: np.ndarray, g: np.ndarray, popt: np.ndarray,
+                   g0_scale: Optional[float] = None, sigma: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Builds the per-model fit record (prediction, information criteria, covariance 'pcov'
+        and standard errors 'perr') from fitted parameters.
+        g0_scale: fitted amplitude scale (free-G0 fits); counts as one extra parameter.
+        sigma: per-point standard deviations of the 'sigma' weighting.
+        """
+        model = self.models[name]
+        popt = np.asarray(popt, dtype=float)
+        if name == 'Dual_KWW':
+            # --- Label-switching fix: always enforce tau1 < tau2 ---
+            A, tau1, beta1, tau2, beta2 = popt
+            if tau1 > tau2:
+                # Swap modes so tau1 is always the fast (short) mode
+                A, tau1, beta1, tau2, beta2 = (1.0 - A), tau2, beta2, tau1, beta1
+                popt = np.array([A, tau1, beta1, tau2, beta2])
+        pred = model.func(t, *popt)
+        if g0_scale is None:
+            r2, aic, bic = self._calculate_metrics(g, pred, len(popt))
+            pcov = self._covariance(name, t, g, popt, sigma)
+            return {'popt': popt, 'r2': r2, 'aic': aic, 'bic': bic, 'curve': pred,
+                    'pcov': pcov, 'perr': np.sqrt(np.abs(np.diag(pcov)))}
+        pred = g0_scale * pred
+        r2, aic, bic = self._calculate_metrics(g, pred, len(popt) + 1)
+        # Shape-parameter covariance at the fitted scale
+        pcov = self._covariance(name, t, g / g0_scale, popt, None if sigma is None else sigma / g0_scale)
+        return {'popt': popt, 'r2': r2, 'aic': aic, 'bic': bic, 'curve': pred, 'G0_scale': g0_scale,
+                'pcov': pcov, 'perr': np.sqrt(np.abs(np.diag(pcov)))}
 
-        # Dual KWW
-        if 'Dual_KWW' in models_to_fit:
-            model_d = self.models['Dual_KWW']
+    def _failed_entry(self, name: str, g: np.ndarray) -> Dict[str, Any]:
+        n_params = len(self.models[name].get_bounds()[0])
+        return {'r2': 0, 'aic': np.inf, 'bic': np.inf, 'curve': g, 'popt': [np.nan] * n_params,
+                'pcov': np.full((n_params, n_params), np.nan), 'perr': np.full(n_params, np.nan)}
+
+    def _uses_multistart(self, name: str) -> bool:
+        return self.multistart and name in self.MULTISTART_MODELS
+
+    def _uses_varpro(self, name: str) -> bool:
+        # The amplitude is only linear in the data for linear residuals
+        return (self.varpro and name == 'Dual_KWW' and not self._uses_multistart(name)
+                and self.weighting != 'log')
+
+    def _fit_problem(self, name: str, t: np.ndarray, g: np.ndarray,
+                     sigma: Optional[np.ndarray] = None) -> Tuple[Any, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """(model, t, y, sigma) as the solver sees them under the weighting scheme."""
+        model = self.models[name]
+        if self.weighting == 'log':
+            pos = g > 0
+            return LogResiduals(model), t[pos], np.log(g[pos]), None
+        return model, t, g, residual_sigma(g, self.weighting, sigma)
+
+    def _fit_cost(self, g: np.ndarray, pred: np.ndarray, sigma: Optional[np.ndarray] = None) -> float:
+        """The objective the fits minimize, evaluated for a prediction."""
+        if self.weighting == 'log':
+            pos = g > 0
+            return float(np.sum((np.log(np.maximum(pred[pos], 1e-300)) - np.log(g[pos]))**2))
+        s = residual_sigma(g, self.weighting, sigma)
+        return float(np.sum(((g - pred) if s is None else (g - pred) / s)**2))
+
+    def _initial_guess(self, name: str, t: np.ndarray, g: np.ndarray,
+                       spectrum: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> List[float]:
+        """Model starting point; spectrum is a coarse spectrum already computed for (t, g) (Dual KWW only)."""
+        model = self.models[name]
+        if name == 'Dual_KWW':
+            return model.get_initial_guess(t, g, spectrum)
+        return model.get_initial_guess(t, g)
+
+    @staticmethod
+    def _known_spectrum(result: Dict[str, Any]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        return result.get('Model_Selection', {}).get('spectrum')
+
+    def _fit_single(self, name: str, t: np.ndarray, g: np.ndarray, sigma: Optional[np.ndarray] = None,
+                    spectrum: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, Any]:
+        model = self.models[name]
+        if self._uses_multistart(name):
+            return self._fit_multistart(name, t, g, sigma, spectrum)
+        fit_model, t_fit, y, s = self._fit_problem(name, t, g, sigma)
+        p0 = self._initial_guess(name, t, g, spectrum)
+        if self._uses_varpro(name):
             try:
-                p0_d = model_d.get_initial_guess(t, g)
-                popt_d, _ = curve_fit(model_d.func, t, g, p0=p0_d, bounds=model_d.get_bounds(), maxfev=10000)
-                # --- Label-switching fix: always enforce tau1 < tau2 ---
-                A, tau1, beta1, tau2, beta2 = popt_d
-                if tau1 > tau2:
-                    # Swap modes so tau1 is always the fast (short) mode
-                    A, tau1, beta1, tau2, beta2 = (1.0 - A), tau2, beta2, tau1, beta1
-                    popt_d = np.array([A, tau1, beta1, tau2, beta2])
-                pred_d = model_d.func(t, *popt_d)
-                r2_d, aic_d, bic_d = self._calculate_metrics(g, pred_d, 5)  # 5 params: A, tau1, beta1, tau2, beta2
-                result['Fits']['Dual_KWW'] = {'popt': popt_d, 'r2': r2_d, 'aic': aic_d, 'bic': bic_d, 'curve': pred_d}
+                popt, g0_scale, _ = varpro_dual_kww(t, g, p0, model.get_bounds(),
+                                                    free_g0=self.free_g0, max_nfev=self.MAXFEV[name],
+                                                    weights=None if s is None else 1.0 / s)
+                return self._fit_entry(name, t, g, popt, g0_scale=g0_scale if self.free_g0 else None, sigma=sigma)
             except Exception:
-                result['Fits']['Dual_KWW'] = {'r2': 0, 'aic': np.inf, 'bic': np.inf, 'curve': g, 'popt': [np.nan]*5}
+                pass  # bounded five-parameter fit below
+        try:
+            popt, _ = curve_fit(fit_model.func, t_fit, y, p0=p0, sigma=s,
+                                bounds=model.get_bounds(), jac=fit_model.jac, maxfev=self.MAXFEV[name])
+            return self._fit_entry(name, t, g, popt, sigma=sigma)
+        except Exception:
+            return self._failed_entry(name, g)
 
+    def _fit_multistart(self, name: str, t: np.ndarray, g: np.ndarray, sigma: Optional[np.ndarray] = None,
+                        spectrum: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Dict[str, Any]:
+        fit_model, t_fit, y, s = self._fit_problem(name, t, g, sigma)
+        try:
+            popt, info = multistart_fit(fit_model, t_fit, y, n_starts=self.MULTISTART_STARTS, top_k=self.MULTISTART_TOP_K,
+                                        rtol=self.MULTISTART_RTOL, maxfev=self.MAXFEV[name],
+                                        p0=self._initial_guess(name, t, g, spectrum), sigma=s)
+        except Exception:
+            return self._failed_entry(name, g)
+        entry = self._fit_entry(name, t, g, popt, sigma=sigma)
+        entry['multistart'] = info
+        return entry
 
+    def _finalize(self, result: Dict[str, Any], Tg: Optional[float], fit_model: Optional[str]) -> Dict[str, Any]:
+        temp = result['Temp']
         # 4. Pick Best
         if result['Fits']:
             best_model = min(result['Fits'], key=lambda k: result['Fits'][k]['aic'])
@@ -119,14 +351,256 @@ class CurveAnalyzer:
         # 5. Auto Explanation (With WLF Warning)
         if best_model in result['Fits'] and result['Fits'][best_model]['r2'] > 0:
             best_r2 = result['Fits'][best_model]['r2']
-            explanation = self.auto.generate_explanation(temp, best_model, best_r2, quality)
+            explanation = self.auto.generate_explanation(temp, best_model, best_r2, result['Quality'])
         else:
             best_r2 = 0.0
             explanation = f"Model {best_model} fit was not computed or failed."
         
+        for name, reason in result.get('Skipped_Fits', {}).items():
+            explanation += f"\n- ⏭️ {name} not fitted: {reason}."
+
         if Tg is not None and (Tg <= temp < Tg + 20):
             explanation += "\n\n⚠️ **Note:** Temperature is near Tg. Dynamics may follow WLF (super-Arrhenius) rather than pure Arrhenius."
             
         result['Auto_Explanation'] = explanation
         
-        return result
\ No newline at end of file
+        return result
+
+    def _settings(self) -> Dict[str, Any]:
+        """Analyzer configuration that changes fit results (part of the cache key)."""
+        return {
+            'min_points': self.processor.min_points,
+            'max_points': self.processor.max_points,
+            'downsample': self.processor.downsample,
+            'min_quality': self.min_quality,
+            'adaptive': self.adaptive,
+            'multistart': self.multistart,
+            'varpro': self.varpro,
+            'free_g0': self.free_g0,
+            'weighting': self.weighting,
+        }
+
+    def _cache_key(self, temp: float, df_raw: pd.DataFrame, Tg: Optional[float], fit_model: Optional[str],
+                   solver: str = 'single') -> str:
+        # The parse-time fingerprint stands in for the raw arrays, so they are not rehashed.
+        # solver: 'single' (fit_one_temp) or 'batched' (fit_many); the two paths can end in
+        # different local minima, so they never share entries
+        extra = {}
+        if self.weighting == 'sigma' and self._has_sigma(df_raw):
+            extra['sigma'] = fingerprint_arrays(df_raw['Sigma'].to_numpy(dtype=float)).digest
+        return ResultCache.make_key(curve=curve_fingerprint(df_raw).digest, temp=float(temp), Tg=Tg,
+                                    fit_model=fit_model, solver=solver, **extra, **self._settings())
+
+    def fit_one_temp(self, temp: float, df_raw: pd.DataFrame, Tg: Optional[float] = None, fit_model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Runs analysis for one temperature.
+        If Tg is provided and temp < Tg, returns a 'Frozen' status.
+        """
+        key = self._cache_key(temp, df_raw, Tg, fit_model) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        result = self._prepare_curve(temp, df_raw, Tg)
+        if result['Valid']:
+            t, g = result['Raw']['t'], result['Raw']['g']
+
+            # 3. Fit Models (cheap ones first; gated models may be skipped in adaptive mode)
+            for name in self._models_to_fit(fit_model):
+                if self._is_gated(name, fit_model):
+                    reason = self._dual_kww_gate(result)
+                    if reason is not None:
+                        self._skip_fit(result, name, reason)
+                        continue
+                result['Fits'][name] = self._fit_single(name, t, g, result['Raw'].get('sigma'),
+                                                        self._known_spectrum(result))
+
+            result = self._finalize(result, Tg, fit_model)
+
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def fit_many(self, curves: Mapping[float, pd.DataFrame], Tg: Optional[float] = None, fit_model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Runs analysis for all temperatures in one vectorized solve per model.
+        Curves are padded into one masked array and fitted together with a batched
+        Levenberg-Marquardt loop; any curve that does not converge falls back to
+        the single-curve TRF fit. Results come back in the iteration order of `curves`.
+        Curves already in the result cache are not refitted.
+        """
+        items = list(curves.items())
+        keys = [self._cache_key(temp, df, Tg, fit_model, solver='batched') if self.cache is not None else None
+                for temp, df in items]
+        results = [self.cache.get(key) if key is not None else None for key in keys]
+
+        pending = [i for i, r in enumerate(results) if r is None]
+        fitted = self._fit_many_uncached([items[i] for i in pending], Tg, fit_model)
+        for i, res in zip(pending, fitted):
+            results[i] = res
+            if keys[i] is not None:
+                self.cache.put(keys[i], res)
+        return results
+
+    def _fit_many_uncached(self, items: List[Tuple[float, pd.DataFrame]], Tg: Optional[float], fit_model: Optional[str]) -> List[Dict[str, Any]]:
+        results = [self._prepare_curve(temp, df, Tg, score=False) for temp, df in items]
+        self._apply_quality(results)
+        valid = [r for r in results if r['Valid']]
+        if not valid:
+            return results
+
+        models = self._models_to_fit(fit_model)
+        for name in models:
+            if not self._is_gated(name, fit_model):
+                self._fit_batch(name, valid)
+        for name in models:
+            if self._is_gated(name, fit_model):
+                attempt = []
+                for r in valid:
+                    reason = self._dual_kww_gate(r)
+                    if reason is None:
+                        attempt.append(r)
+                    else:
+                        self._skip_fit(r, name, reason)
+                self._fit_batch(name, attempt)
+
+        # Nested-model guard: a batched solution that does not fit better than the model it
+        # contains has collapsed onto it (e.g. a dead Dual KWW mode at A=0) or stopped in a
+        # local minimum, so retry it with the single-curve TRF fit
+        for r in valid:
+            t, g, sigma = r['Raw']['t'], r['Raw']['g'], r['Raw'].get('sigma')
+            for name, nested in self.NESTED_MODELS.items():
+                if name in r['Fits'] and nested in r['Fits']:
+                    cost = self._fit_cost(g, r['Fits'][name]['curve'], sigma)
+                    cost_nested = self._fit_cost(g, r['Fits'][nested]['curve'], sigma)
+                    if cost >= cost_nested * (1 - 1e-6):
+                        r['Fits'][name] = self._fit_single(name, t, g, sigma, self._known_spectrum(r))
+
+        return [self._finalize(r, Tg, fit_model) if r['Valid'] else r for r in results]
+
+    def _fit_batch(self, name: str, rows: List[Dict[str, Any]]) -> None:
+        """Fits one model to the prepared results `rows` in a single batched solve (TRF fallback per curve)."""
+        if not rows:
+            return
+        if self._uses_multistart(name) or self._uses_varpro(name):
+            # Multi-start and VarPro fits are per curve; the batched solver is a plain single-start LM
+            for r in rows:
+                r['Fits'][name] = self._fit_single(name, r['Raw']['t'], r['Raw']['g'], r['Raw'].get('sigma'),
+                                                   self._known_spectrum(r))
+            return
+        model = self.models[name]
+        problems = [self._fit_problem(name, r['Raw']['t'], r['Raw']['g'], r['Raw'].get('sigma')) for r in rows]
+        fit_model = problems[0][0]
+        T, G, mask = pad_curves([(t_fit, y) for _, t_fit, y, _ in problems])
+        weights = None
+        if any(s is not None for *_, s in problems):
+            _, weights, _ = pad_curves([(t_fit, 1.0 / s if s is not None else np.ones_like(y))
+                                        for _, t_fit, y, s in problems])
+        p0 = np.array([self._initial_guess(name, r['Raw']['t'], r['Raw']['g'], self._known_spectrum(r)) for r in rows],
+                      dtype=float)
+        popt, converged = batched_least_squares(fit_model.func, fit_model.jac, T, G, mask, p0, model.get_bounds(),
+                                                max_iter=self.BATCH_MAX_ITER, weights=weights)
+        for i, r in enumerate(rows):
+            t, g = r['Raw']['t'], r['Raw']['g']
+            if converged[i] and np.all(np.isfinite(popt[i])):
+                r['Fits'][name] = self._fit_entry(name, t, g, popt[i], sigma=r['Raw'].get('sigma'))
+            else:
+                r['Fits'][name] = self._fit_single(name, t, g, r['Raw'].get('sigma'), self._known_spectrum(r))
+
+    def bootstrap_one(self, result: Dict[str, Any], n_boot: int = 1000, kind: str = 'residual', ci: float = 0.95,
+                      seed: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Bootstrap of the best-model fit of one result (see bootstrap_fit): n_boot resampled
+        curves refitted in batches, under the analyzer's weighting. Returns None for invalid
+        or failed fits, else {'Model', 'Kind', 'CI', 'N', 'N_Failed', 'Samples', 'Popt_CI', 'Perr',
+        'Tau_Samples', 'Tau_CI'} with Popt_CI/Tau_CI as central `ci` percentile intervals.
+        N counts the converged replicates and N_Failed the rest; when fewer than
+        BOOTSTRAP_MIN_CONVERGED of them converge, no intervals are given (None, with a warning),
+        since the failures are the hard resamples and the intervals would come out too narrow.
+        """
+        name = result.get('Best_Model')
+        if not result.get('Valid') or name not in result.get('Fits', {}):
+            return None
+        entry = result['Fits'][name]
+        popt = np.asarray(entry['popt'], dtype=float)
+        if not np.all(np.isfinite(popt)):
+            return None
+        raw = result['Raw']
+        scale = entry.get('G0_scale', 1.0)
+        sigma = raw.get('sigma')
+        fit_model, t_fit, y, s = self._fit_problem(name, raw['t'], raw['g'] / scale,
+                                                   None if sigma is None else sigma / scale)
+        samples = bootstrap_fit(fit_model, t_fit, y, popt, n_boot=n_boot, kind=kind, sigma=s, seed=seed,
+                                max_iter=self.BATCH_MAX_ITER, maxfev=self.MAXFEV[name])
+        n_failed = n_boot - len(samples)
+        if len(samples) < 2 or len(samples) < self.BOOTSTRAP_MIN_CONVERGED * n_boot:
+            logger.warning("Bootstrap at %s°C: %d of %d %s refits failed; no intervals given",
+                           result['Temp'], n_failed, n_boot, name)
+            return None
+        if name == 'Dual_KWW':
+            # Same label convention as the fit: tau1 is the fast mode
+            swap = samples[:, 1] > samples[:, 3]
+            samples[swap] = np.column_stack([1.0 - samples[swap, 0], samples[swap, 3], samples[swap, 4],
+                                             samples[swap, 1], samples[swap, 2]])
+        stats = summarize(samples, ci)
+        k = TAU_INDEX[name]
+        return {
+            'Model': name, 'Kind': kind, 'CI': ci, 'N': len(samples), 'N_Failed': n_failed, 'Samples': samples,
+            'Popt_CI': np.column_stack([stats['ci_low'], stats['ci_high']]),
+            'Perr': stats['std'],
+            'Tau_Samples': samples[:, k],
+            'Tau_CI': (float(stats['ci_low'][k]), float(stats['ci_high'][k])),
+        }
+
+    def bootstrap(self, results: List[Dict[str, Any]], n_boot: int = 1000, kind: str = 'residual', ci: float = 0.95,
+                  workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Runs bootstrap_one for every result on a process pool (same pool rules as fit_all)
+        and stores each outcome in result['Bootstrap'] (in place). Returns `results`.
+        """
+        n = len(results)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, n)
+        seeds = list(range(n))
+
+        boots = None
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    boots = list(pool.map(self.bootstrap_one, results, [n_boot] * n, [kind] * n, [ci] * n, seeds))
+            except (BrokenProcessPool, PicklingError, OSError):
+                boots = None
+        if boots is None:
+            boots = [self.bootstrap_one(r, n_boot, kind, ci, seed) for r, seed in zip(results, seeds)]
+
+        for r, b in zip(results, boots):
+            if b is not None:
+                r['Bootstrap'] = b
+        return results
+
+    def fit_all(self, curves: Mapping[float, pd.DataFrame], Tg: Optional[float] = None, fit_model: Optional[str] = None,
+                workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Runs fit_one_temp for every temperature on a process pool.
+        workers=None uses one process per CPU (capped at the number of curves); workers<=1
+        runs serially. Results come back in the iteration order of `curves`, and the
+        serial path is used whenever the pool cannot be started or breaks.
+        """
+        temps = list(curves.keys())
+        dfs = [curves[temp] for temp in temps]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(temps))
+
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    chunksize = max(1, len(temps) // (4 * workers))
+                    return list(pool.map(self.fit_one_temp, temps, dfs, [Tg] * len(temps),
+                                         [fit_model] * len(temps), chunksize=chunksize))
+            except (BrokenProcessPool, PicklingError, OSError):
+                pass
+
+        return [self.fit_one_temp(temp, df, Tg=Tg, fit_model=fit_model) for temp, df in zip(temps, dfs)]
@@ -6,39 +6,86 @@ Created on Thu Dec  4 15:36:00 2025
 """
 
 import numpy as np
+from typing import Dict, Optional, Sequence, Tuple, Union
+from can_relax.core.curve_set import CurveSet
+from can_relax.core.processing import DataProcessor
 
 class AutoEngine:
+    # Weights of the component scores in the overall quality score
+    QUALITY_WEIGHTS = {'noise': 0.4, 'range': 0.4, 'wiggle': 0.2}
+    # Tail length used for the noise estimate
+    NOISE_TAIL = 10
+    # Curves shorter than this score 0
+    MIN_POINTS = 6
+
     def __init__(self) -> None:
         pass
 
-    def compute_signal_quality(self, t: np.ndarray, g: np.ndarray) -> float:
+    def score_curves(self, curves: Union[CurveSet, Sequence[Tuple[np.ndarray, np.ndarray]]],
+                     processor: Optional[DataProcessor] = None) -> Dict[str, np.ndarray]:
         """
-        Returns a Quality Score (0.0 to 1.0) based on noise and drift.
+        Scores many curves in one vectorized pass.
+        curves: a sequence of (t, g) pairs, with g normalized to ~1 at the start (as returned
+                by DataProcessor.trim_curve), or a parsed CurveSet, whose raw curves are first
+                trimmed and normalized with `processor` (default DataProcessor()); curves
+                that do not survive trimming score 0.
+        Returns arrays (one entry per curve) for the components 'noise', 'range', 'wiggle'
+        and the weighted, clipped total 'quality'.
         """
-        if len(t) < 6: return 0.0
+        if isinstance(curves, CurveSet):
+            processor = processor or DataProcessor()
+            pairs = []
+            for temp in curves:
+                t, g, _ = processor.trim_curve(*(np.asarray(a, dtype=float) for a in curves.arrays(temp)))
+                pairs.append((np.empty(0), np.empty(0)) if t is None else (t, g))
+            curves = pairs
+        gs = [np.asarray(g, dtype=float) for _, g in curves]
+        flat = np.concatenate(gs) if gs else np.empty(0)
+        lengths = np.array([len(g) for g in gs], dtype=np.int64)
+        n_curves = len(lengths)
+        if n_curves == 0:
+            return {k: np.empty(0) for k in ('noise', 'range', 'wiggle', 'quality')}
+
+        # Right-align the ragged curves in one padded array so every tail ends in the last column
+        n_max = max(int(lengths.max()), 2)
+        row = np.repeat(np.arange(n_curves), lengths)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        col = n_max - lengths[row] + (np.arange(len(flat)) - starts[row])
+        G = np.zeros((n_curves, n_max))
+        mask = np.zeros((n_curves, n_max), dtype=bool)
+        G[row, col] = flat
+        mask[row, col] = True
+        n = lengths.astype(float)
+
+        # 1. Noise: standard deviation of the last NOISE_TAIL points (penalized above 2% of G0)
+        tail = mask & (np.arange(n_max) >= n_max - self.NOISE_TAIL)
+        k = np.maximum(tail.sum(axis=1), 1)
+        mean = np.sum(G * tail, axis=1) / k
+        noise = np.sqrt(np.sum(((G - mean[:, None]) * tail)**2, axis=1) / k)
+        noise_score = np.maximum(0, 1 - noise / 0.02)
 
-        # 1. Noise Check (Standard deviation of the last 10 points)
-        # Ideally, the tail should be smooth.
-        tail = g[-10:]
-        noise = np.std(tail)
-        # If noise > 2% of G0, penalize.
-        noise_score = max(0, 1 - noise / 0.02)
+        # 2. Dynamic range: relaxation of at least 10% scores 1
+        first = G[np.arange(n_curves), np.minimum(n_max - lengths, n_max - 1)]
+        range_score = np.minimum(1, (first - G[:, -1]) / 0.10)
 
-        # 2. Dynamic Range Check (Did it actually relax?)
-        # If G drops by less than 10%, it's probably not a good relaxation curve.
-        drop = g[0] - g[-1]
-        range_score = min(1, drop / 0.10)
+        # 3. Wiggle: sign changes of the first derivative
+        signs = np.sign(np.diff(G, axis=1))
+        changes = (signs[:, 1:] != signs[:, :-1]) & mask[:, :-2]
+        wiggle_score = np.maximum(0, 1 - changes.sum(axis=1) / (np.maximum(n, 1) * 0.1))
 
-        # 3. Wiggle Check (First derivative sign changes)
-        # Relaxation should be monotonic. Wiggles = Instability.
-        diffs = np.diff(g)
-        sign_changes = np.sum(np.diff(np.sign(diffs)) != 0)
-        # Allow a few wiggles due to noise, but punish heavy oscillation
-        wiggle_score = max(0, 1 - sign_changes / (len(t) * 0.1))
+        w = self.QUALITY_WEIGHTS
+        quality = np.clip(w['noise'] * noise_score + w['range'] * range_score + w['wiggle'] * wiggle_score, 0, 1)
+        short = lengths < self.MIN_POINTS
+        quality[short] = 0.0
+        return {'noise': np.where(short, 0.0, noise_score), 'range': np.where(short, 0.0, range_score),
+                'wiggle': np.where(short, 0.0, wiggle_score), 'quality': quality}
 
-        # Weighted Final Score
-        final_score = (0.4 * noise_score) + (0.4 * range_score) + (0.2 * wiggle_score)
-        return float(np.clip(final_score, 0, 1))
+    def compute_signal_quality(self, t: np.ndarray, g: np.ndarray) -> float:
+        """
+        Returns a Quality Score (0.0 to 1.0) based on noise and drift.
+        Single-curve form of score_curves.
+        """
+        return float(self.score_curves([(t, g)])['quality'][0])
 
     def generate_explanation(self, temp: float, best_model: str, r2: float, quality: float) -> str:
         """
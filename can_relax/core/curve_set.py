@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from can_relax.core.fingerprint import ATTR_KEY, Fingerprint, fingerprint_arrays
+
+
+class CurveSet(Mapping):
+    """
+    All relaxation curves of one dataset in two contiguous buffers (Time, Modulus)
+    plus an offsets array, i.e. a ragged array keyed by temperature. An optional
+    third buffer carries per-point standard deviations ('Sigma' column, NaN for
+    curves that had none) for weighting='sigma' fits.
+
+    Curve i occupies buffer[offsets[i]:offsets[i + 1]]. arrays(temp) returns
+    zero-copy views; the Mapping interface ({temp: DataFrame}) is kept for the
+    existing callers and builds lightweight DataFrames over the same views, with
+    the curve fingerprint already attached.
+    """
+    DTYPES = (np.float64, np.float32)
+
+    def __init__(self, temps, time: np.ndarray, modulus: np.ndarray, offsets: np.ndarray,
+                 fingerprints: Optional[List[Fingerprint]] = None, sigma: Optional[np.ndarray] = None) -> None:
+        self.temps = np.asarray(temps, dtype=float)
+        self.time = np.asarray(time)
+        self.modulus = np.asarray(modulus)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if self.time.dtype not in self.DTYPES or self.modulus.dtype != self.time.dtype:
+            raise ValueError("time and modulus buffers must share a float64 or float32 dtype")
+        if len(self.offsets) != len(self.temps) + 1 or self.offsets[-1] != len(self.time) or len(self.time) != len(self.modulus):
+            raise ValueError("offsets do not match the buffers")
+        self.sigma = None if sigma is None else np.asarray(sigma)
+        if self.sigma is not None and (self.sigma.dtype != self.time.dtype or len(self.sigma) != len(self.time)):
+            raise ValueError("sigma buffer does not match the time buffer")
+        # Read-only buffers make the views handed out safe to share
+        self.time.flags.writeable = False
+        self.modulus.flags.writeable = False
+        if self.sigma is not None:
+            self.sigma.flags.writeable = False
+        self._index = {float(T): i for i, T in enumerate(self.temps)}
+        if fingerprints is None:
+            fingerprints = [fingerprint_arrays(*self._slices(i)) for i in range(len(self.temps))]
+        self.fingerprints = list(fingerprints)
+
+    @classmethod
+    def from_dict(cls, curves: Mapping, dtype=np.float64) -> "CurveSet":
+        """
+        Packs a {temp: DataFrame(['Time', 'Modulus'])} mapping into one CurveSet (in iteration order).
+        A 'Sigma' column on any of the frames is kept in the sigma buffer.
+        """
+        if isinstance(curves, cls) and curves.time.dtype == dtype:
+            return curves
+        temps = [float(T) for T in curves]
+        lengths = [len(curves[T]) for T in curves]
+        offsets = np.zeros(len(temps) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        time = np.empty(offsets[-1], dtype=dtype)
+        modulus = np.empty(offsets[-1], dtype=dtype)
+        has_sigma = any('Sigma' in df for df in curves.values())
+        sigma = np.full(offsets[-1], np.nan, dtype=dtype) if has_sigma else None
+        for i, df in enumerate(curves.values()):
+            time[offsets[i]:offsets[i + 1]] = df['Time'].to_numpy(dtype=float)
+            modulus[offsets[i]:offsets[i + 1]] = df['Modulus'].to_numpy(dtype=float)
+            if has_sigma and 'Sigma' in df:
+                sigma[offsets[i]:offsets[i + 1]] = df['Sigma'].to_numpy(dtype=float)
+        return cls(temps, time, modulus, offsets, sigma=sigma)
+
+    def _slices(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return self.time[lo:hi], self.modulus[lo:hi]
+
+    def arrays(self, temp: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy (t, g) views of one curve."""
+        return self._slices(self._index[float(temp)])
+
+    def sigmas(self, temp: float) -> Optional[np.ndarray]:
+        """Zero-copy view of one curve's standard deviations, or None if it has none."""
+        if self.sigma is None:
+            return None
+        i = self._index[float(temp)]
+        s = self.sigma[self.offsets[i]:self.offsets[i + 1]]
+        return s if np.isfinite(s).any() else None
+
+    def fingerprint(self, temp: float) -> Fingerprint:
+        return self.fingerprints[self._index[float(temp)]]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self) -> int:
+        sigma = 0 if self.sigma is None else self.sigma.nbytes
+        return self.time.nbytes + self.modulus.nbytes + sigma + self.offsets.nbytes + self.temps.nbytes
+
+    # --- Mapping interface: {temp: DataFrame} ---
+    def __getitem__(self, temp: float) -> pd.DataFrame:
+        i = self._index[float(temp)]
+        t, g = self._slices(i)
+        columns = {'Time': t, 'Modulus': g}
+        s = self.sigmas(temp)
+        if s is not None:
+            columns['Sigma'] = s
+        df = pd.DataFrame(columns, copy=False)
+        df.attrs[ATTR_KEY] = self.fingerprints[i].bound_to(df['Time'].to_numpy(), df['Modulus'].to_numpy())
+        return df
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self.temps)
+
+    def __contains__(self, temp) -> bool:
+        try:
+            return float(temp) in self._index
+        except (TypeError, ValueError):
+            return False
+
+    def __repr__(self) -> str:
+        return f"CurveSet({len(self)} curves, {len(self.time)} points, {self.time.dtype})"
+
+    def to_dict(self) -> Dict[float, pd.DataFrame]:
+        return {T: self[T] for T in self}
@@ -0,0 +1,114 @@
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Mapping, Optional, Tuple
+
+# Key under which parsed curves carry their fingerprint (DataFrame.attrs)
+ATTR_KEY = 'fingerprint'
+
+
+def _root(arr: np.ndarray) -> np.ndarray:
+    """The array that owns the memory behind a chain of views."""
+    while isinstance(arr.base, np.ndarray):
+        arr = arr.base
+    return arr
+
+
+def _layout(arr: np.ndarray) -> Tuple[int, Tuple[int, ...], Tuple[int, ...]]:
+    return arr.__array_interface__['data'][0], arr.shape, arr.strides
+
+
+class Fingerprint:
+    """
+    Small immutable content digest of one or more arrays (blake2b over dtype, shape
+    and raw bytes). Computed once when data enters the app and then used as a cheap
+    stand-in for the arrays in cache keys and Streamlit hash_funcs.
+
+    A fingerprint bound to read-only buffers (see bound_to) also records which memory
+    it describes, so a copy of its frame carrying it in attrs can be told apart from
+    the original. The binding is process-local: equality, hashing and pickling use the
+    digest only.
+    """
+    __slots__ = ('digest', 'n_rows', 'source')
+
+    def __init__(self, digest: str, n_rows: int = -1, source: Optional[tuple] = None) -> None:
+        object.__setattr__(self, 'digest', digest)
+        object.__setattr__(self, 'n_rows', n_rows)
+        object.__setattr__(self, 'source', source)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Fingerprint is immutable")
+
+    def __reduce__(self):
+        return (Fingerprint, (self.digest, self.n_rows))
+
+    def bound_to(self, *arrays: np.ndarray) -> "Fingerprint":
+        """
+        This digest tied to the given arrays, which must be views of read-only buffers
+        (as handed out by CurveSet); unbound if any of them is writable.
+        """
+        roots = [_root(arr) for arr in arrays]
+        if any(root.flags.writeable for root in roots):
+            return Fingerprint(self.digest, self.n_rows)
+        # Holding the owners keeps their memory from being reused by other arrays
+        return Fingerprint(self.digest, self.n_rows, tuple((root, _layout(arr)) for root, arr in zip(roots, arrays)))
+
+    def describes(self, *arrays: np.ndarray) -> bool:
+        """True if this fingerprint is bound to exactly these read-only views."""
+        if self.source is None or len(arrays) != len(self.source):
+            return False
+        return all(_root(arr) is root and not root.flags.writeable and _layout(arr) == layout
+                   for arr, (root, layout) in zip(arrays, self.source))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Fingerprint) and self.digest == other.digest
+
+    def __hash__(self) -> int:
+        return hash(self.digest)
+
+    def __str__(self) -> str:
+        return self.digest
+
+    def __repr__(self) -> str:
+        return f"Fingerprint({self.digest[:12]}…, n_rows={self.n_rows})"
+
+
+def fingerprint_arrays(*arrays: np.ndarray) -> Fingerprint:
+    """Fingerprints the given arrays in order; equal content, dtype and shape give equal digests."""
+    h = hashlib.blake2b(digest_size=16)
+    n_rows = -1
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        n_rows = len(arr) if arr.ndim else 1
+        h.update(f"{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.data)
+    return Fingerprint(h.hexdigest(), n_rows)
+
+
+def attach_fingerprint(df: pd.DataFrame) -> pd.DataFrame:
+    """Computes the Time/Modulus fingerprint of a curve and stores it in df.attrs (in place)."""
+    t, g = df['Time'].to_numpy(), df['Modulus'].to_numpy()
+    df.attrs[ATTR_KEY] = fingerprint_arrays(t, g).bound_to(t, g)
+    return df
+
+
+def curve_fingerprint(df: pd.DataFrame) -> Fingerprint:
+    """
+    Returns the fingerprint stored in df.attrs when it is still bound to the frame's own
+    read-only Time/Modulus buffers (frames handed out by CurveSet or the parser), and
+    recomputes it otherwise. pandas carries attrs through copy(), filtering, column
+    assignment and arithmetic, so an unbound stored digest may describe other data.
+    """
+    fp: Optional[Fingerprint] = df.attrs.get(ATTR_KEY)
+    if isinstance(fp, Fingerprint) and fp.describes(df['Time'].to_numpy(), df['Modulus'].to_numpy()):
+        return fp
+    return attach_fingerprint(df).attrs[ATTR_KEY]
+
+
+def curves_fingerprint(curves: Mapping[float, pd.DataFrame]) -> Fingerprint:
+    """Combined fingerprint of a {temp: curve} mapping (temperatures and curve digests, in order)."""
+    h = hashlib.blake2b(digest_size=16)
+    for temp, df in curves.items():
+        h.update(repr(float(temp)).encode())
+        h.update(curve_fingerprint(df).digest.encode())
+    return Fingerprint(h.hexdigest(), len(curves))
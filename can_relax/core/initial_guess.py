@@ -0,0 +1,132 @@
+"""
+Data-driven starting points for the KWW fits.
+
+Single KWW: ln(-ln g) is linear in ln t with slope beta, so a straight-line fit
+over the relaxing part of the curve gives tau and beta directly.
+Dual KWW: a coarse, smooth relaxation spectrum H(tau) is split between its two
+strongest peaks; each lobe's log-mean and log-variance give tau and beta (for a
+KWW decay Var(ln tau) = pi^2/6 * (1/beta^2 - 1) and <ln tau> = ln tau_K + (1 - 1/beta) * gamma),
+and A follows from a linear least-squares solve. A unimodal spectrum starts from
+the Single KWW guess as the dominant mode.
+Each guess is compared with the simple fixed-point guess and the one with the
+lower squared error is returned, so the engine never starts worse than before.
+"""
+import numpy as np
+from typing import List, Optional, Tuple
+
+from can_relax.core.spectrum import SpectrumAnalyzer, spectrum_peaks
+
+EULER_GAMMA = 0.5772156649015329
+# Part of the curve used for the linearized fit (ln(-ln g) blows up near 0 and 1)
+LINEAR_RANGE = (0.02, 0.98)
+BETA_RANGE = (0.2, 1.0)
+SPECTRUM = {'num_modes': 40, 'alpha': 1.0, 'regularization': 'second_derivative', 'subtract_G_eq': False}
+PEAK_FRACTION = 0.1
+UNIMODAL_A = 0.8
+UNIMODAL_TAU_RATIO = 10.0
+
+
+def _kww(t: np.ndarray, tau: float, beta: float) -> np.ndarray:
+    return np.exp(-(np.abs(t) / tau) ** beta)
+
+
+def _sse(g: np.ndarray, model: np.ndarray) -> float:
+    return float(np.sum((g - model) ** 2))
+
+
+def nearest_1e_tau(t: np.ndarray, g: np.ndarray) -> float:
+    """Time at which g is closest to 1/e."""
+    return float(t[np.abs(g - 0.368).argmin()])
+
+
+def linearized_kww(t: np.ndarray, g: np.ndarray) -> Optional[Tuple[float, float]]:
+    """(tau, beta) from a straight-line fit of ln(-ln g) against ln t; None if too few usable points."""
+    lo, hi = LINEAR_RANGE
+    m = (t > 0) & (g > lo) & (g < hi)
+    if np.count_nonzero(m) < 3:
+        return None
+    x = np.log(t[m])
+    if np.ptp(x) == 0:
+        return None
+    slope, intercept = np.polyfit(x, np.log(-np.log(g[m])), 1)
+    if not (np.isfinite(slope) and slope > 0):
+        return None
+    beta = float(np.clip(slope, *BETA_RANGE))
+    tau = float(np.exp(-intercept / slope))
+    if not np.isfinite(tau) or tau <= 0:
+        return None
+    return tau, beta
+
+
+def kww_guess(t: np.ndarray, g: np.ndarray) -> List[float]:
+    """[tau, beta] for SingleKWW."""
+    candidates = [(nearest_1e_tau(t, g), 0.5)]
+    lin = linearized_kww(t, g)
+    if lin is not None:
+        candidates.append(lin)
+    tau, beta = min(candidates, key=lambda p: _sse(g, _kww(t, *p)))
+    return [tau, beta]
+
+
+def _lobe(ln_tau: np.ndarray, H: np.ndarray) -> Tuple[float, float]:
+    """KWW tau and beta of one spectrum lobe."""
+    w = float(H.sum())
+    mean = float(np.sum(H * ln_tau) / w)
+    var = float(np.sum(H * (ln_tau - mean) ** 2) / w)
+    beta = float(np.clip(1.0 / np.sqrt(1.0 + 6.0 * var / np.pi ** 2), *BETA_RANGE))
+    tau = float(np.exp(mean - (1.0 - 1.0 / beta) * EULER_GAMMA))
+    return tau, beta
+
+
+def coarse_spectrum(t: np.ndarray, g: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(tau_grid, H) of the smooth SPECTRUM used for the guesses (and the adaptive model gate); None if it fails."""
+    try:
+        return SpectrumAnalyzer().compute_continuous_spectrum(t, g, **SPECTRUM)
+    except Exception:
+        return None
+
+
+def spectrum_dual_kww(t: np.ndarray, g: np.ndarray,
+                      spectrum: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Optional[List[float]]:
+    """
+    [A, tau1, beta1, tau2, beta2] from a two-lobe split of a coarse spectrum; None if it fails.
+    spectrum: a coarse_spectrum(t, g) already computed by the caller.
+    """
+    if spectrum is None:
+        spectrum = coarse_spectrum(t, g)
+    if spectrum is None:
+        return None
+    tau_grid, H = spectrum
+    if not np.any(H > 0):
+        return None
+    ln_tau = np.log(tau_grid)
+    peaks = spectrum_peaks(H, PEAK_FRACTION)
+    if len(peaks) < 2:
+        # Unimodal: Dual KWW is nearly degenerate; start from the Single KWW shape
+        # as the dominant mode plus a minor slow tail
+        tau, beta = linearized_kww(t, g) or (nearest_1e_tau(t, g), 0.5)
+        return [UNIMODAL_A, tau, beta, UNIMODAL_TAU_RATIO * tau, 0.5]
+    # Split at the minimum between the two strongest peaks
+    p1, p2 = np.sort(peaks[np.argsort(H[peaks])[-2:]])
+    split = p1 + int(np.argmin(H[p1:p2 + 1]))
+    tau1, beta1 = _lobe(ln_tau[:split], H[:split])
+    tau2, beta2 = _lobe(ln_tau[split:], H[split:])
+    # With the shapes fixed the amplitude is linear: g = A*e1 + (1 - A)*e2
+    e1, e2 = _kww(t, tau1, beta1), _kww(t, tau2, beta2)
+    d = e1 - e2
+    denom = float(np.dot(d, d))
+    A = float(np.dot(g - e2, d) / denom) if denom > 0 else 0.5
+    return [float(np.clip(A, 0.02, 0.98)), tau1, beta1, tau2, beta2]
+
+
+def dual_kww_guess(t: np.ndarray, g: np.ndarray,
+                   spectrum: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> List[float]:
+    """[A, tau1, beta1, tau2, beta2] for DualKWW (tau1 < tau2); spectrum as in spectrum_dual_kww."""
+    def dual(p):
+        return p[0] * _kww(t, p[1], p[2]) + (1 - p[0]) * _kww(t, p[3], p[4])
+
+    candidates = [[0.5, float(t[len(t) // 4]), 0.8, float(t[3 * len(t) // 4]), 0.5]]
+    spec = spectrum_dual_kww(t, g, spectrum)
+    if spec is not None:
+        candidates.append(spec)
+    return min(candidates, key=lambda p: _sse(g, dual(p)))
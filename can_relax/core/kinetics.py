@@ -6,6 +6,15 @@ R_GAS = 8.314462  # J/mol*K
 H_PLANCK = 6.62607015e-34  # J*s
 K_BOLTZMANN = 1.380649e-23  # J/K
 LN_H_OVER_KB = np.log(H_PLANCK / K_BOLTZMANN)  # ~ -23.759978
+ETA_TV = 1e12  # Pa*s, viscosity that defines the topology-freezing temperature Tv
+
+def tv_from_arrhenius(slope, intercept, G_prime_Pa):
+    """
+    Tv (°C) where the Arrhenius fit ln(tau) = slope/T + intercept reaches tau = ETA_TV / G'
+    (Maxwell relation eta = G' * tau). Works elementwise on arrays of slopes/intercepts.
+    """
+    ln_tau_target = np.log(ETA_TV / G_prime_Pa)
+    return 1.0 / ((ln_tau_target - intercept) / slope) - 273.15
 
 class KineticsEngine:
     def __init__(self):
@@ -40,6 +49,49 @@ class KineticsEngine:
             "Plot": {"x": inv_T_standard, "y": ln_tau, "y_pred": slope_std*inv_T_standard + intercept_std}
         }
 
+    def arrhenius_bootstrap(self, temps_C, tau_samples, G_prime_Pa=None, ci=0.95):
+        """
+        Propagates per-temperature bootstrap samples of tau (e.g. CurveAnalyzer.bootstrap's
+        'Tau_Samples') to Ea and, with G_prime_Pa, to Tv. Replicate b refits ln(tau) vs 1/T
+        through the b-th sample of every temperature (all replicates in one vectorized
+        regression); samples are truncated to the shortest set.
+        Returns: Ea/Tv medians, standard deviations and central `ci` intervals, and the
+        replicate values.
+        """
+        if len(temps_C) < 2 or len(temps_C) != len(tau_samples): return None
+        n = min(len(s) for s in tau_samples)
+        if n < 2: return None
+
+        inv_T = 1.0 / (np.array(temps_C, dtype=float) + 273.15)
+        ln_tau = np.log(np.stack([np.asarray(s, dtype=float)[:n] for s in tau_samples]))  # (n_temps, n)
+        x_c = inv_T - inv_T.mean()
+        slopes = x_c @ (ln_tau - ln_tau.mean(axis=0)) / (x_c @ x_c)
+        intercepts = ln_tau.mean(axis=0) - slopes * inv_T.mean()
+        Ea = slopes * R_GAS / 1000.0
+        q = 50.0 * (1.0 - ci)
+
+        out = {
+            "Type": "Arrhenius_Bootstrap",
+            "N": n,
+            "CI": ci,
+            "Ea": float(np.median(Ea)),
+            "Ea_std": float(np.std(Ea, ddof=1)),
+            "Ea_CI": (float(np.percentile(Ea, q)), float(np.percentile(Ea, 100.0 - q))),
+            "Samples": {"Ea": Ea},
+        }
+        if G_prime_Pa is not None:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                Tv = tv_from_arrhenius(slopes, intercepts, G_prime_Pa)
+            Tv = Tv[np.isfinite(Tv)]
+            if len(Tv) > 1:
+                out.update({
+                    "Tv": float(np.median(Tv)),
+                    "Tv_std": float(np.std(Tv, ddof=1)),
+                    "Tv_CI": (float(np.percentile(Tv, q)), float(np.percentile(Tv, 100.0 - q))),
+                })
+                out["Samples"]["Tv"] = Tv
+        return out
+
     def fit_eyring(self, temps_C, taus):
         """
         Fits Eyring equation: ln(tau * T) = ln(h / kB) - dS / R + dH / (R * T)
@@ -1,12 +1,53 @@
 import numpy as np
 
+from can_relax.core.initial_guess import dual_kww_guess, kww_guess
+
+# Residual weighting schemes (see CurveAnalyzer): plain residuals, residuals relative to g,
+# residuals of ln(g), or residuals scaled by user-supplied standard deviations
+WEIGHTINGS = ('uniform', 'relative', 'log', 'sigma')
+# Relative weighting treats g below this (fraction of G0) as this, so the noisy tail cannot dominate
+RELATIVE_FLOOR = 0.01
+
+def residual_sigma(g, weighting, sigma=None):
+    """Per-point sigma for the linear-residual schemes; None means unweighted."""
+    if weighting == 'relative':
+        return np.maximum(np.abs(g), RELATIVE_FLOOR)
+    if weighting == 'sigma' and sigma is not None:
+        return np.maximum(np.asarray(sigma, dtype=float), 1e-12)
+    return None
+
+class LogResiduals:
+    """Wraps a model so fits compare ln(model) with ln(data) ('log' weighting)."""
+    def __init__(self, model):
+        self.model = model
+
+    def func(self, t, *params):
+        return np.log(np.maximum(self.model.func(t, *params), 1e-300))
+
+    def jac(self, t, *params):
+        # d ln(f) = df / f
+        f = np.maximum(self.model.func(t, *params), 1e-300)
+        return self.model.jac(t, *params) / f[..., None]
+
+    def get_initial_guess(self, t, g):
+        return self.model.get_initial_guess(t, g)
+
+    def get_bounds(self):
+        return self.model.get_bounds()
+
 class Maxwell:
     def func(self, t, tau):
         # Safety: Prevent division by zero
-        tau = max(tau, 1e-12)
+        tau = np.maximum(tau, 1e-12)
         # Data is pre-normalized, so G0=1.0
         return np.exp(-(t / tau))
 
+    def jac(self, t, tau):
+        # Closed-form Jacobian d(func)/d(tau), shape (n_points, 1)
+        tau = np.maximum(tau, 1e-12)
+        g = np.exp(-(t / tau))
+        return np.stack([g * t / tau**2], axis=-1)
+
     def get_initial_guess(self, t, g):
         # Estimate tau where g drops to 1/e
         idx = (np.abs(g - 0.368)).argmin()
@@ -17,18 +58,34 @@ class Maxwell:
         # Tau only (data is pre-normalized)
         return ([1e-9], [1e12])
 
+def _kww_terms(t, tau, beta):
+    """Returns (exp(-(t/tau)^beta), d/dtau, d/dbeta) for one stretched exponential."""
+    t_safe = np.abs(t)
+    tau = np.maximum(tau, 1e-12)
+    # Guard log(0) at t=0 where (t/tau)^beta is 0 anyway
+    log_x = np.log(np.maximum(t_safe, 1e-300) / tau)
+    x_beta = (t_safe / tau) ** beta
+    g = np.exp(-x_beta)
+    d_tau = g * x_beta * beta / tau
+    d_beta = -g * x_beta * log_x
+    return g, d_tau, d_beta
+
 class SingleKWW:
     def func(self, t, tau, beta):
         # Safety: Take abs(t) to prevent negative power errors during fitting
         t_safe = np.abs(t)
-        tau = max(tau, 1e-12)
+        tau = np.maximum(tau, 1e-12)
         # Data is pre-normalized, so G0=1.0
         return np.exp(-((t_safe / tau) ** beta))
 
+    def jac(self, t, tau, beta):
+        # Closed-form Jacobian w.r.t. (tau, beta), shape (n_points, 2)
+        _, d_tau, d_beta = _kww_terms(t, tau, beta)
+        return np.stack([d_tau, d_beta], axis=-1)
+
     def get_initial_guess(self, t, g):
-        idx = (np.abs(g - 0.368)).argmin()
-        tau_guess = t[idx] if idx < len(t) else t[-1]
-        return [tau_guess, 0.5] # tau, beta
+        # tau, beta from the linearized curve (see initial_guess.kww_guess)
+        return kww_guess(t, g)
 
     def get_bounds(self):
         return ([1e-9, 0.1], [1e12, 1.0])
@@ -36,23 +93,34 @@ class SingleKWW:
 class DualKWW:
     def func(self, t, A, tau1, beta1, tau2, beta2):
         t_safe = np.abs(t)
-        tau1 = max(tau1, 1e-12)
-        tau2 = max(tau2, 1e-12)
+        tau1 = np.maximum(tau1, 1e-12)
+        tau2 = np.maximum(tau2, 1e-12)
         
         term1 = A * np.exp(-((t_safe / tau1) ** beta1))
         term2 = (1 - A) * np.exp(-((t_safe / tau2) ** beta2))
         # Data is pre-normalized, so G0=1.0
         return term1 + term2
 
-    def get_initial_guess(self, t, g):
-        # Guess: Tau1 is early, Tau2 is late
-        tau1 = t[len(t)//4]
-        tau2 = t[3*len(t)//4]
-        return [0.5, tau1, 0.8, tau2, 0.5]
+    def jac(self, t, A, tau1, beta1, tau2, beta2):
+        # Closed-form Jacobian w.r.t. (A, tau1, beta1, tau2, beta2), shape (n_points, 5)
+        g1, d_tau1, d_beta1 = _kww_terms(t, tau1, beta1)
+        g2, d_tau2, d_beta2 = _kww_terms(t, tau2, beta2)
+        return np.stack([
+            g1 - g2,
+            A * d_tau1,
+            A * d_beta1,
+            (1 - A) * d_tau2,
+            (1 - A) * d_beta2,
+        ], axis=-1)
+
+    def get_initial_guess(self, t, g, spectrum=None):
+        # A, tau1 (early), beta1, tau2 (late), beta2 from a coarse spectrum (see initial_guess.dual_kww_guess);
+        # spectrum: an initial_guess.coarse_spectrum(t, g) the caller already has
+        return dual_kww_guess(t, g, spectrum)
 
     def get_bounds(self):
         # A, tau1, beta1, tau2, beta2 (no G0)
         return (
             [0.0, 1e-9, 0.1, 1e-9, 0.1], 
             [1.0, 1e12, 1.0, 1e12, 1.0]
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,77 @@
+import numpy as np
+from scipy.optimize import curve_fit
+from scipy.stats import qmc
+from typing import Any, Dict, List, Optional, Tuple
+
+from can_relax.core.batch_fit import log_scaled
+
+
+def latin_hypercube_starts(bounds: Tuple[List[float], List[float]], t: np.ndarray, n_starts: int,
+                           seed: int = 0) -> np.ndarray:
+    """
+    Latin-hypercube start points of shape (n_starts, n_params) inside the bounds.
+    Parameters whose bounds span many decades (relaxation times) are sampled
+    log-uniformly over the decades the data can resolve, t_min/10 .. 10*t_max.
+    """
+    lb = np.asarray(bounds[0], dtype=float)
+    ub = np.asarray(bounds[1], dtype=float)
+    log_scale = log_scaled(lb, ub)
+    t_pos = t[t > 0]
+    lo, hi = lb.copy(), ub.copy()
+    if len(t_pos):
+        lo = np.where(log_scale, np.maximum(lb, t_pos.min() / 10), lb)
+        hi = np.where(log_scale, np.minimum(ub, t_pos.max() * 10), ub)
+    lo = np.where(log_scale, np.log(np.where(log_scale, lo, 1.0)), lo)
+    hi = np.where(log_scale, np.log(np.where(log_scale, hi, 1.0)), hi)
+    u = qmc.LatinHypercube(d=len(lb), seed=seed).random(n_starts)
+    starts = lo + u * (hi - lo)
+    return np.where(log_scale, np.exp(starts), starts)
+
+
+def multistart_fit(model, t: np.ndarray, g: np.ndarray, n_starts: int = 64, top_k: int = 5, rtol: float = 1e-4,
+                   maxfev: int = 10000, seed: int = 0,
+                   p0: Optional[List[float]] = None,
+                   sigma: Optional[np.ndarray] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+    """
+    Global fit of `model` to (t, g): scores n_starts Latin-hypercube starts (plus p0, if
+    given, as the first start) with one vectorized model evaluation, then refines the
+    top_k best by TRF in order of their score. Refinement stops as soon as two refined
+    fits agree to within rtol in sum of squares, i.e. the same minimum was reached twice
+    (sums of squares below 1e-10 of the signal energy count as equal).
+    sigma: optional per-point standard deviations; residuals are scaled by 1/sigma.
+
+    Returns (popt, info) with info = {'starts', 'refined', 'agreed'}.
+    Raises RuntimeError if no refinement succeeds.
+    """
+    bounds = model.get_bounds()
+    starts = latin_hypercube_starts(bounds, t, n_starts, seed=seed)
+    if p0 is not None:
+        starts = np.vstack([np.clip(np.asarray(p0, dtype=float), bounds[0], bounds[1]), starts])
+
+    # Score every start at once: params broadcast as (n_starts, 1) against t as (1, n_points)
+    pred = model.func(t[None, :], *[starts[:, k:k + 1] for k in range(starts.shape[1])])
+    w = 1.0 / sigma if sigma is not None else np.ones_like(g)
+    sse = np.sum(((pred - g[None, :]) * w) ** 2, axis=1)
+    order = np.argsort(np.where(np.isfinite(sse), sse, np.inf))[:top_k]
+
+    # Exact fits end at round-off level, where relative agreement is meaningless
+    floor = 1e-10 * float(np.sum((g * w) ** 2))
+    best, best_sse, refined = None, np.inf, []
+    for idx in order:
+        try:
+            popt, _ = curve_fit(model.func, t, g, p0=starts[idx], sigma=sigma, bounds=bounds, jac=model.jac,
+                                maxfev=maxfev)
+        except Exception:
+            continue
+        cost = float(np.sum(((g - model.func(t, *popt)) * w) ** 2))
+        if not np.isfinite(cost):
+            continue
+        agreed = any(abs(cost - c) <= rtol * max(c, cost, floor) for c in refined)
+        refined.append(cost)
+        if cost < best_sse:
+            best, best_sse = popt, cost
+        if agreed:
+            return best, {'starts': len(starts), 'refined': len(refined), 'agreed': True}
+    if best is None:
+        raise RuntimeError("No multi-start refinement converged")
+    return best, {'starts': len(starts), 'refined': len(refined), 'agreed': False}
@@ -3,22 +3,135 @@ import pandas as pd
 from scipy.signal import savgol_filter
 from typing import Tuple, Optional
 
+# trim_curve shifts every curve so its first kept sample sits at this time (s)
+TIME_ORIGIN = 0.01
+
+class LogBinDecimator:
+    """
+    Online log-time decimator for curves that arrive in chunks.
+    Samples are averaged into fixed bins of width 1/bins_per_decade in log10(t),
+    so no time range has to be known up front and memory stays bounded by the
+    number of occupied bins. Samples that trim_curve would discard (non-finite
+    values, non-positive modulus) are skipped.
+
+    relative=False anchors the bins at absolute decades of t; all samples with
+    t <= 0 share one leading bin. relative=True bins log10(t - t_first + TIME_ORIGIN),
+    with t_first the first sample seen, i.e. the time axis trim_curve produces for a
+    curve that relaxes from its first sample, so early times keep their resolution
+    after the shift; samples earlier than t_first share the leading bin. The result
+    then depends on the order samples arrive in (time-ordered exports are the target).
+    """
+    def __init__(self, bins_per_decade: int = 100, relative: bool = False) -> None:
+        self.bins_per_decade = bins_per_decade
+        self.relative = relative
+        self.t_first = None
+        self.n_samples = 0
+        self._keys = np.empty(0, dtype=np.int64)
+        self._count = np.empty(0)
+        self._sum_t = np.empty(0)
+        self._sum_g = np.empty(0)
+
+    def update(self, t: np.ndarray, g: np.ndarray) -> None:
+        t = np.asarray(t, dtype=float)
+        g = np.asarray(g, dtype=float)
+        ok = np.isfinite(t) & np.isfinite(g) & (g > 0)
+        t, g = t[ok], g[ok]
+        if t.size == 0:
+            return
+        self.n_samples += t.size
+        x = t
+        if self.relative:
+            if self.t_first is None:
+                self.t_first = float(t[0])
+            x = t - self.t_first + TIME_ORIGIN
+        keys = np.floor(np.log10(np.where(x > 0, x, 1.0)) * self.bins_per_decade).astype(np.int64)
+        keys[x <= 0] = np.iinfo(np.int64).min
+
+        # Merge this chunk's bins with the running totals in one reduction
+        all_keys = np.concatenate((self._keys, keys))
+        uniq, inv = np.unique(all_keys, return_inverse=True)
+        weights = np.concatenate((self._count, np.ones(t.size)))
+        self._count = np.bincount(inv, weights=weights, minlength=uniq.size)
+        self._sum_t = np.bincount(inv, weights=np.concatenate((self._sum_t, t)), minlength=uniq.size)
+        self._sum_g = np.bincount(inv, weights=np.concatenate((self._sum_g, g)), minlength=uniq.size)
+        self._keys = uniq
+
+    def result(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Bin-averaged (t, g) in ascending time order."""
+        return self._sum_t / self._count, self._sum_g / self._count
+
+    def __len__(self) -> int:
+        return self._keys.size
+
+
 class DataProcessor:
-    def __init__(self, min_points: int = 8) -> None:
+    DOWNSAMPLE_MODES = ('nearest', 'mean')
+
+    def __init__(self, min_points: int = 8, max_points: int = 250, downsample: str = 'nearest') -> None:
+        """
+        max_points: target point count of the logarithmic downsampling step
+        downsample: 'nearest' keeps the sample closest to each log-spaced target time,
+                    'mean' averages all samples falling in each log bin
+        """
+        if downsample not in self.DOWNSAMPLE_MODES:
+            raise ValueError(f"downsample must be one of {self.DOWNSAMPLE_MODES}, got {downsample!r}")
         self.min_points = min_points
+        self.max_points = max_points
+        self.downsample = downsample
+
+    def log_downsample(self, t: np.ndarray, g: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Reduces a sorted, positive-time curve to at most ~max_points log-spaced samples.
+        Boundary samples are always kept.
+        """
+        n = len(t)
+        if n <= self.max_points:
+            return t, g
+
+        if self.downsample == 'mean':
+            # Average within log bins; empty bins simply disappear
+            edges = np.logspace(np.log10(t[0]), np.log10(t[-1]), self.max_points + 1)
+            bin_idx = np.clip(np.searchsorted(edges, t, side='right') - 1, 0, self.max_points - 1)
+            counts = np.bincount(bin_idx, minlength=self.max_points)
+            filled = counts > 0
+            t_mean = np.bincount(bin_idx, weights=t, minlength=self.max_points)[filled] / counts[filled]
+            g_mean = np.bincount(bin_idx, weights=g, minlength=self.max_points)[filled] / counts[filled]
+            # Keep the exact boundary samples so the time axis still starts at t[0]
+            t_out = np.concatenate(([t[0]], t_mean, [t[-1]]))
+            g_out = np.concatenate(([g[0]], g_mean, [g[-1]]))
+            keep = np.concatenate(([True], np.diff(t_out) > 0))
+            return t_out[keep], g_out[keep]
+
+        # Nearest sample to each log-spaced target, found by binary search
+        targets = np.logspace(np.log10(t[0]), np.log10(t[-1]), self.max_points)
+        right = np.clip(np.searchsorted(t, targets), 1, n - 1)
+        left = right - 1
+        nearest = np.where(targets - t[left] <= t[right] - targets, left, right)
+        # Ensure boundaries are included
+        indices = np.unique(np.concatenate(([0], nearest, [n - 1])))
+        return t[indices], g[indices]
 
     def trim_curve(self, t: np.ndarray, g: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[float]]:
         """
         Trims artifacts from the relaxation curve.
         Returns: (t_trimmed, g_normalized, G0) or (None, None, None)
         """
+        return self.trim_curve_with_shift(t, g)[:3]
+
+    def trim_curve_with_shift(self, t: np.ndarray, g: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray],
+                                                                          Optional[float], Optional[float]]:
+        """
+        trim_curve that also returns the time shift it applied, so per-sample data can be
+        mapped back onto the raw time axis (raw time = trimmed time + shift).
+        Returns: (t_trimmed, g_normalized, G0, shift) or (None, None, None, None)
+        """
         # 1. Basic Cleaning (Remove NaNs, Infs, Negatives)
         mask = (g > 0) & np.isfinite(g) & np.isfinite(t)
         t = t[mask]
         g = g[mask]
         
         if len(t) < self.min_points:
-            return None, None, None
+            return None, None, None, None
 
         # 2. Sort by time (crucial for raw data)
         idx = np.argsort(t)
@@ -76,11 +189,12 @@ class DataProcessor:
         g_clean = g[start_idx:end_idx]
         
         if len(t_clean) < self.min_points:
-            return None, None, None
+            return None, None, None, None
 
         # 8. Normalize
         # Time starts at 0.01 (better numerical stability than 1e-6)
-        t_final = t_clean - t_clean[0] + 0.01
+        t_final = t_clean - t_clean[0] + TIME_ORIGIN
+        shift = float(t_clean[0] - TIME_ORIGIN)
         
         # G0 should be the maximum value (peak of the curve after trimming start artifacts)
         # Taking max of first 10% of points to be robust against single outliers
@@ -89,24 +203,9 @@ class DataProcessor:
         
         g_final = g_clean / G0
 
-        # 9. Logarithmic downsampling for performance (max 250 points)
+        # 9. Logarithmic downsampling for performance (max_points, default 250)
         # Stress relaxation curves are logarithmic; log-spacing preserves detail at short times
         # while significantly reducing size to make KWW/Dual-KWW fitting and Tikhonov Ridge regression instant.
-        max_pts = 250
-        if len(t_final) > max_pts:
-            bins = np.logspace(np.log10(t_final[0]), np.log10(t_final[-1]), max_pts)
-            indices = []
-            for b in bins:
-                idx = np.abs(t_final - b).argmin()
-                if idx not in indices:
-                    indices.append(idx)
-            # Ensure boundaries are included
-            if 0 not in indices:
-                indices.insert(0, 0)
-            if len(t_final) - 1 not in indices:
-                indices.append(len(t_final) - 1)
-            indices = sorted(list(set(indices)))
-            t_final = t_final[indices]
-            g_final = g_final[indices]
-
-        return t_final, g_final, G0
\ No newline at end of file
+        t_final, g_final = self.log_downsample(t_final, g_final)
+
+        return t_final, g_final, G0, shift
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import pickle
+import hashlib
+import logging
+import pathlib
+import sqlite3
+import time
+import numpy as np
+from typing import Any, Optional
+
+from can_relax import __version__
+
+logger = logging.getLogger("ResultCache")
+
+def default_cache_path() -> pathlib.Path:
+    """Cache location: $CAN_RELAX_CACHE_DIR, else ~/.cache/can_relax."""
+    root = os.environ.get("CAN_RELAX_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "can_relax")
+    return pathlib.Path(root) / "results.sqlite"
+
+class ResultCache:
+    """
+    Persistent, content-addressed store for fit results (SQLite, one pickled blob per key).
+    Keys digest the raw curve arrays, the fit settings and the package version, so a
+    result is reused only for identical inputs and code. Least recently used entries
+    are evicted once the stored blobs exceed max_bytes.
+    Cache errors are logged and treated as misses; they never fail a fit.
+    """
+    def __init__(self, path: Optional[os.PathLike] = None, max_bytes: int = 512 * 1024**2) -> None:
+        self.path = pathlib.Path(path) if path is not None else default_cache_path()
+        self.max_bytes = max_bytes
+        self._conn = None
+
+    # The connection is per-process; worker processes reopen it lazily
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_conn'] = None
+        return state
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=30.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(*arrays: np.ndarray, **params: Any) -> str:
+        """Digest of array contents (dtype, shape, bytes), keyword settings and the package version."""
+        h = hashlib.blake2b(digest_size=20)
+        h.update(__version__.encode())
+        for arr in arrays:
+            arr = np.ascontiguousarray(arr)
+            h.update(f"{arr.dtype.str}{arr.shape}".encode())
+            h.update(arr.tobytes())
+        h.update(repr(sorted(params.items())).encode())
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            with conn:
+                conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+            return pickle.loads(row[0])
+        except (sqlite3.Error, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.debug("Result cache read failed: %s", e)
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            if len(blob) > self.max_bytes:
+                return
+            conn = self._connect()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                             (key, sqlite3.Binary(blob), len(blob), time.time()))
+                self._evict(conn)
+        except (sqlite3.Error, pickle.PicklingError) as e:
+            logger.debug("Result cache write failed: %s", e)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY accessed ASC").fetchall():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def total_bytes(self) -> int:
+        try:
+            return int(self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0])
+        except sqlite3.Error:
+            return 0
+
+    def clear(self) -> None:
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM results")
+        except sqlite3.Error as e:
+            logger.debug("Result cache clear failed: %s", e)
@@ -5,25 +5,131 @@ Created on Sat Dec  6 14:03:52 2025
 @author: khoab
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
-from sklearn.linear_model import Ridge, Lasso
 from scipy.interpolate import interp1d
+from scipy.optimize import nnls
+
+class KernelCache:
+    """
+    Thread-safe LRU cache of kernel matrices A_ij = exp(-t_i / tau_j) and their SVDs,
+    keyed on a digest of the (t, tau) grids and bounded by total array memory.
+    Returned arrays are read-only views shared between callers.
+    """
+    def __init__(self, max_bytes=256 * 1024**2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def grid_key(t, tau_grid):
+        h = hashlib.blake2b(digest_size=16)
+        for arr in (t, tau_grid):
+            arr = np.ascontiguousarray(arr, dtype=np.float64)
+            h.update(str(arr.shape).encode())
+            h.update(arr.tobytes())
+        return h.hexdigest()
+
+    def _get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        value = compute()
+        arrays = value if isinstance(value, tuple) else (value,)
+        for arr in arrays:
+            arr.setflags(write=False)
+        nbytes = sum(arr.nbytes for arr in arrays)
+        with self._lock:
+            if key not in self._entries and nbytes <= self.max_bytes:
+                self._entries[key] = (value, nbytes)
+                self._nbytes += nbytes
+                while self._nbytes > self.max_bytes:
+                    _, (_, evicted) = self._entries.popitem(last=False)
+                    self._nbytes -= evicted
+        return value
+
+    def kernel(self, t, tau_grid):
+        """Kernel matrix A_ij = exp(-t_i / tau_j), shape (len(t), len(tau_grid))."""
+        key = ('kernel', self.grid_key(t, tau_grid))
+        return self._get_or_compute(key, lambda: np.exp(-np.asarray(t)[:, None] / np.asarray(tau_grid)[None, :]))
+
+    def svd(self, t, tau_grid):
+        """Thin SVD (U, s, Vt) of the kernel matrix."""
+        key = ('svd', self.grid_key(t, tau_grid))
+        return self._get_or_compute(key, lambda: np.linalg.svd(self.kernel(t, tau_grid), full_matrices=False))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+# Shared by all SpectrumAnalyzer instances (the GUI builds a fresh analyzer per call)
+DEFAULT_KERNEL_CACHE = KernelCache()
+
+def regularization_operator(num_modes, kind='identity'):
+    """
+    Builds the Tikhonov operator L for the penalty alpha*||L*H||^2.
+    'identity': L = I (small amplitudes), 'second_derivative': second differences
+    along log(tau) (smooth spectra), shape (num_modes - 2, num_modes).
+    """
+    if kind == 'identity':
+        return np.eye(num_modes)
+    if kind == 'second_derivative':
+        L = np.zeros((num_modes - 2, num_modes))
+        idx = np.arange(num_modes - 2)
+        L[idx, idx] = 1.0
+        L[idx, idx + 1] = -2.0
+        L[idx, idx + 2] = 1.0
+        return L
+    raise ValueError(f"Unknown regularization {kind!r}; expected 'identity' or 'second_derivative'")
+
+def spectrum_peaks(H, min_fraction=0.1):
+    """
+    Indices of the local maxima of a spectrum H(tau) (edges count against zero) that exceed
+    min_fraction of its maximum. Empty for an all-zero spectrum.
+    """
+    H = np.asarray(H, dtype=float)
+    if not np.any(H > 0):
+        return np.empty(0, dtype=np.int64)
+    Hp = np.concatenate(([0.0], H, [0.0]))
+    return np.flatnonzero((Hp[1:-1] > Hp[:-2]) & (Hp[1:-1] >= Hp[2:]) & (H > min_fraction * H.max()))
 
 class SpectrumAnalyzer:
-    def __init__(self):
-        pass
+    SOLVERS = ('nnls', 'ridge')
+
+    def __init__(self, kernel_cache=None):
+        self.kernel_cache = kernel_cache if kernel_cache is not None else DEFAULT_KERNEL_CACHE
 
-    def compute_continuous_spectrum(self, t, g, num_modes=50, alpha=0.1, optimize_alpha=False, subtract_G_eq=True):
+    def compute_continuous_spectrum(self, t, g, num_modes=50, alpha=0.1, optimize_alpha=False, subtract_G_eq=True,
+                                    solver='nnls', regularization='identity', fast_preview=False):
         """
-        Calculates H(tau) using Tikhonov Regularization (Ridge Regression).
+        Calculates H(tau) using Tikhonov Regularization with H >= 0.
         t: Time array (s)
         g: Modulus array (normalized G/G0 or absolute G)
         num_modes: Number of tau bins (resolution)
         alpha: Regularization strength (smoothness factor, ignored if optimize_alpha=True)
         optimize_alpha: If True, uses the L-curve corner method to find the optimal alpha.
         subtract_G_eq: If True, detects and subtracts the non-zero equilibration modulus tail value.
+        solver: 'nnls' (active-set NNLS on the augmented system [A; sqrt(alpha)*L]) or
+                'ridge' (scikit-learn Ridge(positive=True), identity regularization only)
+        regularization: 'identity' or 'second_derivative' (see regularization_operator)
+        fast_preview: With optimize_alpha, pick alpha from the closed-form unconstrained
+                      L-curve of one (cached) SVD, then run a single constrained solve.
+                      Identity regularization only; otherwise the regular search is used.
         """
+        if solver not in self.SOLVERS:
+            raise ValueError(f"Unknown solver {solver!r}; expected one of {self.SOLVERS}")
+        if solver == 'ridge' and regularization != 'identity':
+            raise ValueError("The 'ridge' solver only supports identity regularization; use solver='nnls'")
         # 1. Detect and subtract G_eq (equilibration modulus tail)
         if subtract_G_eq:
             # Average of last 5% of data points as equilibration modulus
@@ -52,64 +158,159 @@ class SpectrumAnalyzer:
         tau_max = t.max() * 5.0
         tau_grid = np.logspace(np.log10(tau_min), np.log10(tau_max), num_modes)
         
-        # 3. Build Kernel Matrix A_ij = exp(-t_i / tau_j)
-        A = np.exp(-t[:, None] / tau_grid[None, :])
+        # 3. Build Kernel Matrix A_ij = exp(-t_i / tau_j) (reused across calls with identical grids)
+        A = self.kernel_cache.kernel(t, tau_grid)
         
-        # 4. Solve Inverse Problem with Regularization (Ridge with positive=True constraint)
-        if optimize_alpha:
-            alpha_grid = np.logspace(-5, 2, 40)
-            residual_norms = []
-            solution_norms = []
-            H_grid = []
-            
-            for a in alpha_grid:
-                solver = Ridge(alpha=a, positive=True, fit_intercept=False)
-                solver.fit(A, g_target)
-                H_val = solver.coef_
-                
-                # Solution norm ||H||_2
-                sol_norm = np.linalg.norm(H_val)
-                # Residual norm ||A*H - g_target||_2
-                res_norm = np.linalg.norm(A.dot(H_val) - g_target)
-                
-                residual_norms.append(res_norm)
-                solution_norms.append(sol_norm)
-                H_grid.append(H_val)
-                
-            # Log-log coordinate transform for L-curve corner detection
-            log_res = np.log10(np.array(residual_norms) + 1e-15)
-            log_sol = np.log10(np.array(solution_norms) + 1e-15)
-            
-            # Use geometric maximum distance method (secant line distance)
-            x1, y1 = log_res[0], log_sol[0]
-            xN, yN = log_res[-1], log_sol[-1]
-            
-            best_idx = 0
-            max_dist = -1.0
-            
-            a_coef = yN - y1
-            b_coef = -(xN - x1)
-            c_coef = xN * y1 - yN * x1
-            denom = np.sqrt(a_coef**2 + b_coef**2)
-            
-            if denom > 1e-12:
-                for idx in range(len(alpha_grid)):
-                    dist = abs(a_coef * log_res[idx] + b_coef * log_sol[idx] + c_coef) / denom
-                    if dist > max_dist:
-                        max_dist = dist
-                        best_idx = idx
-            
-            best_alpha = alpha_grid[best_idx]
-            H_values = H_grid[best_idx]
+        # 4. Solve Inverse Problem with Regularization (positivity-constrained Tikhonov)
+        L = regularization_operator(num_modes, regularization)
+        if optimize_alpha and fast_preview and regularization == 'identity':
+            best_alpha = self._lcurve_svd(t, tau_grid, g_target)
+            H_values = self._solve_tikhonov(A, g_target, best_alpha, L, solver=solver)
+            self.last_alpha = best_alpha
+        elif optimize_alpha:
+            best_alpha, H_values = self._lcurve_search(A, g_target, L, solver=solver)
             self.last_alpha = best_alpha
         else:
-            solver = Ridge(alpha=alpha, positive=True, fit_intercept=False)
-            solver.fit(A, g_target)
-            H_values = solver.coef_
+            H_values = self._solve_tikhonov(A, g_target, alpha, L, solver=solver)
             self.last_alpha = alpha
             
         return tau_grid, H_values
 
+    def _solve_tikhonov(self, A, g_target, alpha, L, x0=None, solver='nnls'):
+        """
+        Minimizes ||A*H - g||^2 + alpha*||L*H||^2 subject to H >= 0.
+        'nnls' solves it exactly as NNLS on the augmented system [A; sqrt(alpha)*L].
+        With x0, the support of the neighbouring solution is tried first as the active
+        set: one least-squares solve, accepted if it satisfies the KKT conditions.
+        Otherwise scipy's Lawson-Hanson NNLS solves from scratch.
+        'ridge' delegates to scikit-learn (imported lazily; identity L only).
+        """
+        if solver == 'ridge':
+            from sklearn.linear_model import Ridge
+            model = Ridge(alpha=alpha, positive=True, fit_intercept=False)
+            model.fit(A, g_target)
+            return model.coef_
+
+        n = A.shape[1]
+        M = np.vstack([A, np.sqrt(alpha) * L])
+        b = np.concatenate([g_target, np.zeros(L.shape[0])])
+
+        if x0 is not None:
+            passive = np.asarray(x0) > 0
+            if passive.any():
+                H = np.zeros(n)
+                H[passive] = np.linalg.lstsq(M[:, passive], b, rcond=None)[0]
+                grad = M.T.dot(M.dot(H) - b)
+                tol = 1e-10 * max(1.0, np.abs(grad).max())
+                # KKT: strictly positive on the support, non-negative gradient off it
+                if np.all(H[passive] > 0) and np.all(grad[~passive] >= -tol):
+                    return H
+
+        return nnls(M, b, maxiter=50 * n)[0]
+
+    @staticmethod
+    def _secant_distance(log_res, log_sol, ends):
+        """Distance of L-curve points from the secant through the two end points ((x1, y1), (xN, yN))."""
+        (x1, y1), (xN, yN) = ends
+        a_coef = yN - y1
+        b_coef = -(xN - x1)
+        c_coef = xN * y1 - yN * x1
+        denom = np.sqrt(a_coef**2 + b_coef**2)
+        if denom <= 1e-12:
+            return np.zeros_like(np.asarray(log_res, dtype=float))
+        return np.abs(a_coef * np.asarray(log_res) + b_coef * np.asarray(log_sol) + c_coef) / denom
+
+    def _lcurve_svd(self, t, tau_grid, g_target, log_alpha_min=-5.0, log_alpha_max=2.0, n_alpha=200):
+        """
+        Closed-form L-curve of unconstrained Tikhonov from one SVD A = U*diag(s)*Vt:
+        with beta = U^T g and filter factors f = s^2 / (s^2 + alpha),
+        ||H||^2 = sum((f*beta/s)^2) and ||A*H - g||^2 = sum(((1-f)*beta)^2) + ||g - U*beta||^2.
+        Every alpha costs O(num_modes); returns the corner alpha (secant criterion).
+        """
+        U, s_vals, _ = self.kernel_cache.svd(t, tau_grid)
+        beta = U.T.dot(g_target)
+        keep = s_vals > s_vals[0] * 1e-14
+        s_k, beta_k = s_vals[keep], beta[keep]
+        # Part of g outside the numerical range of A is never fitted
+        outside = max(float(g_target.dot(g_target) - beta_k.dot(beta_k)), 0.0)
+
+        alphas = np.logspace(log_alpha_min, log_alpha_max, n_alpha)
+        f = s_k[None, :]**2 / (s_k[None, :]**2 + alphas[:, None])
+        sol_norm = np.sqrt(np.sum((f * beta_k / s_k)**2, axis=1))
+        res_norm = np.sqrt(np.sum(((1 - f) * beta_k)**2, axis=1) + outside)
+
+        log_res = np.log10(res_norm + 1e-15)
+        log_sol = np.log10(sol_norm + 1e-15)
+        dist = self._secant_distance(log_res, log_sol, ((log_res[0], log_sol[0]), (log_res[-1], log_sol[-1])))
+        self.last_lcurve = {'alpha': alphas, 'residual_norm': res_norm, 'solution_norm': sol_norm}
+        return float(alphas[int(np.argmax(dist))])
+
+    def _lcurve_search(self, A, g_target, L, solver='nnls', log_alpha_min=-5.0, log_alpha_max=2.0, n_coarse=8, tol=0.05):
+        """
+        Finds the L-curve corner (maximum distance from the secant joining the two
+        ends of the log-log L-curve) without an exhaustive alpha grid: a coarse
+        warm-started sweep brackets the corner, then golden-section search refines it
+        to `tol` decades. Only the best solution is kept.
+        The solution norm is the penalty norm ||L*H||.
+        Returns (best_alpha, H_best).
+        """
+        solutions = {}  # log10(alpha) -> H, used for warm starts only
+        history = []    # (log10 alpha, log residual norm, log solution norm)
+
+        def evaluate(log_a):
+            # Warm start from the already-solved alpha closest in log space
+            x0 = solutions[min(solutions, key=lambda k: abs(k - log_a))] if solutions else None
+            H = self._solve_tikhonov(A, g_target, 10.0**log_a, L, x0=x0, solver=solver)
+            solutions[log_a] = H
+            log_res = np.log10(np.linalg.norm(A.dot(H) - g_target) + 1e-15)
+            log_sol = np.log10(np.linalg.norm(L.dot(H)) + 1e-15)
+            history.append((log_a, log_res, log_sol))
+            return H, log_res, log_sol
+
+        # Ends of the L-curve define the secant line (strong regularization first: smooth H is a good warm start)
+        _, x_hi, y_hi = evaluate(log_alpha_max)
+        _, x_lo, y_lo = evaluate(log_alpha_min)
+        ends = ((x_lo, y_lo), (x_hi, y_hi))
+
+        best = {'dist': -1.0, 'log_a': log_alpha_min, 'H': solutions[log_alpha_min]}
+
+        def corner_distance(log_a):
+            H, log_res, log_sol = evaluate(log_a)
+            dist = float(self._secant_distance(log_res, log_sol, ends))
+            if dist > best['dist']:
+                best.update(dist=dist, log_a=log_a, H=H)
+            return dist
+
+        # Coarse bracket (interior points only, endpoints have zero distance by construction)
+        coarse = np.linspace(log_alpha_max, log_alpha_min, n_coarse + 2)[1:-1]
+        dists = [corner_distance(la) for la in coarse]
+        k = int(np.argmax(dists))
+        lo = coarse[min(k + 1, len(coarse) - 1)] if k + 1 < len(coarse) else log_alpha_min
+        hi = coarse[k - 1] if k > 0 else log_alpha_max
+
+        # Golden-section refinement of the bracket
+        inv_phi = (np.sqrt(5.0) - 1.0) / 2.0
+        x1 = hi - inv_phi * (hi - lo)
+        x2 = lo + inv_phi * (hi - lo)
+        f1, f2 = corner_distance(x1), corner_distance(x2)
+        while hi - lo > tol:
+            if f1 > f2:
+                hi, x2, f2 = x2, x1, f1
+                x1 = hi - inv_phi * (hi - lo)
+                f1 = corner_distance(x1)
+            else:
+                lo, x1, f1 = x1, x2, f2
+                x2 = lo + inv_phi * (hi - lo)
+                f2 = corner_distance(x2)
+
+        history.sort()
+        self.last_lcurve = {
+            'alpha': 10.0**np.array([h[0] for h in history]),
+            'residual_norm': 10.0**np.array([h[1] for h in history]),
+            'solution_norm': 10.0**np.array([h[2] for h in history]),
+        }
+        return 10.0**best['log_a'], best['H']
+
     def get_weighted_avg_tau(self, tau_grid, H_values):
         """Calculates the dominant relaxation time from the spectrum."""
         if np.sum(H_values) == 0: return 0
@@ -8,6 +8,22 @@ Created on Thu Dec  4 15:33:24 2025
 import numpy as np
 from scipy.interpolate import interp1d
 
+# Position of the characteristic relaxation time in each model's popt.
+# Dual_KWW: popt = [A, tau1, beta1, tau2, beta2]
+# We use tau2 (slow mode, index 3) as the canonical network exchange time.
+# tau1 is guaranteed < tau2 after the label-switching fix in analyzer.py.
+# This is consistent with the Kinetics tab which also uses popt[3].
+TAU_INDEX = {'Maxwell': 0, 'Single_KWW': 0, 'Dual_KWW': 3}
+
+def characteristic_tau(res):
+    """
+    Extracts the characteristic relaxation time from a fit result's Best Model.
+    """
+    best = res['Best_Model']
+    if best not in TAU_INDEX:
+        return 1.0
+    return res['Fits'][best]['popt'][TAU_INDEX[best]]
+
 class TTSEngine:
     def __init__(self):
         pass
@@ -34,20 +50,7 @@ class TTSEngine:
         T_ref = ref_res['Temp']
         
         # Get Ref Tau (from the Best Model fit)
-        # We need a robust Tau. Let's extract Tau from the fit parameters.
-        def get_tau(res):
-            best = res['Best_Model']
-            popt = res['Fits'][best]['popt']
-            if best == 'Maxwell': return popt[0]
-            if best == 'Single_KWW': return popt[0]
-            # Dual_KWW: popt = [A, tau1, beta1, tau2, beta2]
-            # We use tau2 (slow mode, index 3) as the canonical network exchange time.
-            # tau1 is guaranteed < tau2 after the label-switching fix in analyzer.py.
-            # This is consistent with the Kinetics tab which also uses popt[3].
-            if best == 'Dual_KWW': return popt[3]
-            return 1.0
-
-        tau_ref = get_tau(ref_res)
+        tau_ref = characteristic_tau(ref_res)
         
         master_t = []
         master_g = []
@@ -55,7 +58,7 @@ class TTSEngine:
         
         for res in sorted_res:
             T = res['Temp']
-            tau = get_tau(res)
+            tau = characteristic_tau(res)
             
             # Calculate Shift Factor a_T
             aT = tau / tau_ref
@@ -0,0 +1,96 @@
+"""
+Variable projection (VarPro) fit of the Dual KWW model.
+
+G(t) = c1 * exp(-(t/tau1)^beta1) + c2 * exp(-(t/tau2)^beta2) is linear in the
+amplitudes once (tau1, beta1, tau2, beta2) are fixed. The amplitudes are solved
+in closed form at every residual evaluation and the nonlinear solver only sees
+the four shape parameters (Kaufman's Jacobian: the shape derivatives with the
+span of the active amplitude directions projected out).
+
+With the trim-time normalization G(0)=1 the amplitudes are (A, 1-A); with
+free_g0 they are independent and non-negative, so the overall scale
+G0_scale = c1 + c2 is fitted as well.
+
+The amplitudes are solved without bounds, which keeps the projected problem
+smooth (clipping A at 0 or 1 would freeze the vanished mode). A solution whose
+amplitudes end up clearly negative is rejected, and the caller falls back to
+the bounded five-parameter fit.
+"""
+import numpy as np
+from scipy.optimize import least_squares
+from typing import Any, Dict, List, Optional, Tuple
+
+from can_relax.core.models import _kww_terms
+
+AMPLITUDE_TOL = 1e-3
+
+
+def _amplitudes(e1: np.ndarray, e2: np.ndarray, g: np.ndarray, free_g0: bool) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Least-squares amplitudes (c1, c2) for fixed shapes and the basis spanned by their free
+    directions. All arrays are already multiplied by the residual weights.
+    """
+    if not free_g0:
+        # g = e2 + A * (e1 - e2)
+        d = e1 - e2
+        dd = float(d @ d)
+        A = float((g - e2) @ d / dd) if dd > 0 else 0.5
+        return np.array([A, 1.0 - A]), d[:, None]
+    E = np.column_stack([e1, e2])
+    return np.linalg.lstsq(E, g, rcond=None)[0], E
+
+
+def varpro_dual_kww(t: np.ndarray, g: np.ndarray, p0: List[float], bounds: Tuple[List[float], List[float]],
+                    free_g0: bool = False, max_nfev: int = 10000,
+                    weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, float, Dict[str, Any]]:
+    """
+    Fits Dual KWW by variable projection, starting from p0 = [A, tau1, beta1, tau2, beta2]
+    (A is ignored; it is solved for). bounds are the DualKWW bounds.
+    weights: optional per-point residual weights (1/sigma).
+
+    Returns (popt, g0_scale, info): popt = [A, tau1, beta1, tau2, beta2], g0_scale = c1 + c2
+    (1.0 unless free_g0) and info = {'nfev', 'status'}.
+    Raises RuntimeError if the solver fails or the amplitudes end up negative.
+    """
+    # Relaxation times are solved as ln(tau): they span decades and the steps stay relative
+    log_tau = np.array([True, False, True, False])
+    lb = np.asarray(bounds[0], dtype=float)[1:]
+    ub = np.asarray(bounds[1], dtype=float)[1:]
+    x0 = np.clip(np.asarray(p0, dtype=float)[1:], lb, ub)
+    lb, ub, x0 = (np.where(log_tau, np.log(v), v) for v in (lb, ub, x0))
+    w = np.ones_like(g) if weights is None else np.asarray(weights, dtype=float)
+    gw = w * g
+
+    def solve(x):
+        p = np.where(log_tau, np.exp(x), x)
+        e1, d_tau1, d_beta1 = _kww_terms(t, p[0], p[1])
+        e2, d_tau2, d_beta2 = _kww_terms(t, p[2], p[3])
+        e1, e2 = w * e1, w * e2
+        c, basis = _amplitudes(e1, e2, gw, free_g0)
+        # Chain rule d/dln(tau) = tau * d/dtau
+        return e1, e2, c, basis, (w * p[0] * d_tau1, w * d_beta1, w * p[2] * d_tau2, w * d_beta2)
+
+    def residuals(x):
+        e1, e2, c, _, _ = solve(x)
+        return c[0] * e1 + c[1] * e2 - gw
+
+    def jacobian(x):
+        _, _, c, basis, (d_tau1, d_beta1, d_tau2, d_beta2) = solve(x)
+        M = np.column_stack([c[0] * d_tau1, c[0] * d_beta1, c[1] * d_tau2, c[1] * d_beta2])
+        if basis.shape[1]:
+            Q, _ = np.linalg.qr(basis)
+            M = M - Q @ (Q.T @ M)
+        return M
+
+    sol = least_squares(residuals, x0, jac=jacobian, bounds=(lb, ub), method='trf', max_nfev=max_nfev)
+    if sol.status <= 0 or not np.all(np.isfinite(sol.x)):
+        raise RuntimeError(f"VarPro solve failed: {sol.message}")
+    e1, e2, c, _, _ = solve(sol.x)
+    # A vanished mode may end a hair below zero; anything more means the bounded fit is needed
+    if np.any(c < -AMPLITUDE_TOL * abs(c.sum())):
+        raise RuntimeError("VarPro solution has a negative mode amplitude")
+    c = np.maximum(c, 0.0)
+    scale = float(c.sum())
+    A = float(c[0] / scale)
+    popt = np.array([A, *np.where(log_tau, np.exp(sol.x), sol.x)])
+    return popt, (scale if free_g0 else 1.0), {'nfev': int(sol.nfev), 'status': int(sol.status)}
@@ -30,11 +30,15 @@ if not hasattr(mathtext.MathTextParser, '_patched_by_us'):
     mathtext.MathTextParser._patched_by_us = True
 
 # Import proper modules from can_relax
-from can_relax.io.parser import parse_wide_format_data as parser_module_func
+from can_relax.io.parser import parse_wide_format_data as parser_module_func, list_excel_sheets
 from can_relax.core.simulator import MaterialSimulator
-from can_relax.core.kinetics import KineticsEngine
+from can_relax.core.kinetics import KineticsEngine, tv_from_arrhenius
 from can_relax.core.tts import TTSEngine
 from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.result_cache import ResultCache
+from can_relax.core.fingerprint import Fingerprint, curve_fingerprint, curves_fingerprint
+from can_relax.core.curve_set import CurveSet
+from can_relax.io.session import save_session, load_session
 from can_relax.core.spectrum import SpectrumAnalyzer
 
 # Shared Plotly layout for visual consistency across all tabs
@@ -109,25 +113,12 @@ def inject_custom_css():
 
 # --- A. ROBUST PARSER (The Fix) ---
 # Helper wrapper for Streamlit UploadedFile
-def parse_uploaded_file(uploaded_file):
-    """Wrapper to handle Streamlit UploadedFile objects for parsing"""
-    import tempfile
-    import os
-    
+def parse_uploaded_file(uploaded_file, sheet_name=None, stream=False):
+    """Parses a Streamlit UploadedFile straight from memory (no temp-file round trip)"""
     if uploaded_file is None:
         return {}
-    
-    # Save to temporary file
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx' if 'xlsx' in uploaded_file.name else '.csv') as tmp:
-        tmp.write(uploaded_file.getbuffer())
-        tmp_path = tmp.name
-    
-    try:
-        # Use the proper parser - it returns {temp: DataFrame with 'Time' and 'Modulus' columns}
-        result = parser_module_func(tmp_path)
-        return result
-    finally:
-        os.unlink(tmp_path)
+    # Returns a CurveSet: {temp: DataFrame with 'Time' and 'Modulus' columns}
+    return parser_module_func(uploaded_file.getvalue(), stream=stream, sheet_name=sheet_name, name=uploaded_file.name)
 
 
 # ==========================================
@@ -143,19 +134,32 @@ sim = MaterialSimulator()
 tts_engine = TTSEngine()
 analyzer = CurveAnalyzer()
 
+# Streamlit would otherwise hash every curve and array argument on each rerun;
+# the fingerprints computed at parse time / trimming stand in for the data.
+FINGERPRINT_HASH_FUNCS = {pd.DataFrame: lambda df: curve_fingerprint(df).digest, Fingerprint: str,
+                          CurveSet: lambda cs: curves_fingerprint(cs).digest}
+
 # Cached curve fitting helper to prevent heavy calculations on every rerun
-@st.cache_data
-def cached_fit_one_temp(temp, df, Tg_input, fit_model):
-    local_analyzer = CurveAnalyzer()
-    return local_analyzer.fit_one_temp(temp, df, Tg=Tg_input, fit_model=fit_model)
+@st.cache_data(hash_funcs=FINGERPRINT_HASH_FUNCS)
+def cached_fit_all(curves, Tg_input, fit_model, workers, min_quality=None, multistart=False, weighting='uniform',
+                   n_boot=0):
+    # The on-disk cache keeps fits across sessions; st.cache_data only covers this process
+    local_analyzer = CurveAnalyzer(cache=ResultCache(), min_quality=min_quality, multistart=multistart,
+                                   weighting=weighting)
+    results = local_analyzer.fit_all(curves, Tg=Tg_input, fit_model=fit_model, workers=workers)
+    if n_boot > 0:
+        local_analyzer.bootstrap(results, n_boot=n_boot, workers=workers)
+    return results
 
 # Cached continuous spectrum helper to prevent heavy calculations on every rerun
-@st.cache_data
-def cached_compute_continuous_spectrum(t, g, num_modes, alpha, optimize_alpha, subtract_G_eq):
+# _t/_g are excluded from hashing; the curve fingerprint identifies them
+@st.cache_data(hash_funcs=FINGERPRINT_HASH_FUNCS)
+def cached_compute_continuous_spectrum(fingerprint, _t, _g, num_modes, alpha, optimize_alpha, subtract_G_eq, regularization='identity', fast_preview=False):
     engine = SpectrumAnalyzer()
     tau_grid, H = engine.compute_continuous_spectrum(
-        t, g, num_modes=num_modes, alpha=alpha, 
-        optimize_alpha=optimize_alpha, subtract_G_eq=subtract_G_eq
+        _t, _g, num_modes=num_modes, alpha=alpha, 
+        optimize_alpha=optimize_alpha, subtract_G_eq=subtract_G_eq,
+        regularization=regularization, fast_preview=fast_preview
     )
     return tau_grid, H, engine.last_alpha, engine.last_G_eq
 
@@ -185,8 +189,46 @@ with tab_analysis:
             label_visibility="collapsed",
             help="Wide-format CSV or XLSX: columns = Temperature, then Time/Modulus pairs"
         )
+        sheet_name = None
+        if uploaded_file is not None and uploaded_file.name.lower().endswith('.xlsx'):
+            try:
+                sheets = list_excel_sheets(uploaded_file)
+            except Exception:
+                sheets = []
+            if len(sheets) > 1:
+                sheet_name = st.selectbox("Sheet", sheets, help="Worksheet holding the Temp/Time/Modulus columns")
+            uploaded_file.seek(0)
+        stream_upload = st.checkbox("Decimate long logs (streaming)", value=False,
+                                    disabled=uploaded_file is not None and uploaded_file.name.lower().endswith('.xlsx'),
+                                    help="Read CSV exports in chunks and log-bin average each curve, so very long logs fit in memory")
         use_example_data = st.checkbox("Use toy_data.csv Example", value=False, key="use_example_data")
 
+    # ── Session (binary bundle, memory-mapped on load) ────────────
+    with st.sidebar.expander("💾 Session", expanded=False):
+        session_dir = st.text_input("Session folder", value="can_relax_session", help="Directory for the parsed curves, fits, spectra and mastercurve")
+        c_save, c_load = st.columns(2)
+        if c_save.button("Save", width='stretch', disabled='results' not in st.session_state):
+            try:
+                save_session(session_dir,
+                             curves=st.session_state.get('curves'),
+                             results=st.session_state.results,
+                             spectra=st.session_state.get('spec_results'),
+                             spec_config=st.session_state.get('spec_config'),
+                             mastercurve=st.session_state.get('master_data'))
+                st.success(f"Saved to {session_dir}")
+            except (OSError, TypeError) as e:
+                st.error(f"Could not save session: {e}")
+        if c_load.button("Load", width='stretch'):
+            try:
+                loaded = load_session(session_dir)
+                for key, state_key in [('curves', 'curves'), ('results', 'results'), ('spectra', 'spec_results'),
+                                       ('spec_config', 'spec_config'), ('mastercurve', 'master_data')]:
+                    if loaded.get(key) is not None:
+                        st.session_state[state_key] = loaded[key]
+                st.success(f"Loaded {len(loaded.get('results') or [])} curves from {session_dir}")
+            except (OSError, ValueError, KeyError) as e:
+                st.error(f"Could not load session: {e}")
+
     # ── Physics & Fitting (merged) ────────────────────────────────
     with st.sidebar.expander("⚙️ Physics & Fitting", expanded=True):
         G_prime_input = st.number_input("Rubbery G' (MPa)", 0.01, 5000.0, 1.0, help="Used for Tv calculation")
@@ -194,6 +236,11 @@ with tab_analysis:
         time_cutoff = st.number_input("Short-Time Cutoff (s)", 0.0, 1000.0, 0.0, step=0.1, help="Discard data points where time < this threshold to remove loading transients/machinery artifacts")
         st.markdown("---")
         fit_model = st.selectbox("Model", ["Maxwell", "Single_KWW", "Dual_KWW"])
+        multistart = st.checkbox("Multi-start Dual KWW", value=False, disabled=fit_model != "Dual_KWW", help="Fit from many Latin-hypercube starts instead of one guess; slower, but avoids local minima")
+        weighting = st.selectbox("Residual Weighting", ["uniform", "relative", "log"], help="uniform: plain residuals; relative/log: weight the long-time tail where the modulus is small")
+        min_quality = st.slider("Min. Signal Quality", 0.0, 1.0, 0.0, 0.05, help="Curves scoring below this (noise, relaxation range, wiggles) are skipped before fitting; 0 fits everything")
+        n_boot = st.number_input("Bootstrap Replicates", 0, 5000, 0, step=100, help="Refits of resampled curves per temperature for 95% intervals of tau, Ea and Tv (0 = off)")
+        n_workers = st.number_input("CPU Workers", 1, os.cpu_count() or 1, os.cpu_count() or 1, help="Parallel processes used to fit the temperatures (1 = serial)")
         kinetics_mode = st.radio("Kinetics Base:", ["Fit Parameter", "Raw 1/e"])
 
     # ── Always-visible Run button ─────────────────────────────────
@@ -204,7 +251,7 @@ with tab_analysis:
     if (uploaded_file or use_example_data) and run_btn:
         # Use the wrapper to parse Streamlit UploadedFile
         if uploaded_file:
-            curves = parse_uploaded_file(uploaded_file)
+            curves = parse_uploaded_file(uploaded_file, sheet_name=sheet_name, stream=stream_upload)
         else:
             curves = parser_module_func("examples/toy_data.csv")
         
@@ -212,26 +259,27 @@ with tab_analysis:
         
         res = []
         skipped = []
-        bar = st.progress(0)
 
-        idx = 0
-        for temp, df in curves.items():
-            # Apply short-time cutoff if set
-            if time_cutoff > 0.0:
-                df = df[df['Time'] >= time_cutoff].copy()
-            
-            # Pass Tg and selected fit_model for cached filtering and fast fit
-            out = cached_fit_one_temp(temp, df, Tg_input, fit_model)
+        # Apply short-time cutoff if set
+        if time_cutoff > 0.0:
+            # Repacked so the cut curves carry fingerprints bound to their own read-only buffers
+            curves = CurveSet.from_dict({temp: df[df['Time'] >= time_cutoff] for temp, df in curves.items()})
+
+        # Pass Tg and selected fit_model for cached filtering and fast fit
+        with st.spinner(f"Fitting {len(curves)} curves..."):
+            outputs = cached_fit_all(curves, Tg_input, fit_model, int(n_workers), min_quality or None,
+                                     multistart and fit_model == "Dual_KWW", weighting, int(n_boot))
+
+        for out in outputs:
             if out.get('Valid', False):
                 out['Best_Model'] = fit_model 
                 out['Tau_1e'] = get_tau_1_over_e(out['Raw']['t'], out['Raw']['g'])
                 res.append(out)
             else:
                 reason = out.get('Reason', 'Below Tg')
-                skipped.append(f"{temp}°C ({reason})")
-            idx += 1
-            bar.progress(idx/len(curves))
+                skipped.append(f"{out['Temp']}°C ({reason})")
             
+        st.session_state.curves = CurveSet.from_dict(curves)
         st.session_state.results = res
         if res: st.success(f"Processed {len(res)} curves.")
         if skipped: st.warning(f"Skipped curves: {', '.join(skipped)}")
@@ -400,12 +448,23 @@ with tab_analysis:
                                 G_Pa = G_prime_input * 1e6
                                 tau_target = 1e12 / G_Pa
                                 ln_tau_target = np.log(tau_target)
-                                Tv_val = (1.0 / ((ln_tau_target - intercept)/slope)) - 273.15 if slope != 0 else 0.0
+                                Tv_val = tv_from_arrhenius(slope, intercept, G_Pa) if slope != 0 else 0.0
                                 
                                 mc1, mc2, mc3 = st.columns(3)
                                 mc1.metric("E\u2090", f"{Ea:.1f} \u00b1 {Ea_std:.1f} kJ/mol")
                                 mc2.metric("T\u1d65", f"{Tv_val:.1f} \u00b0C")
                                 mc3.metric("R\u00b2", f"{r_sq:.4f}")
+
+                                # Bootstrap intervals need samples for every included temperature
+                                boot_map = {r['Temp']: r['Bootstrap']['Tau_Samples'] for r in active_results if 'Bootstrap' in r}
+                                active_temps = active["Temp"].tolist()
+                                if kinetics_mode == "Fit Parameter" and all(T in boot_map for T in active_temps):
+                                    boot_res = k_engine.arrhenius_bootstrap(active_temps, [boot_map[T] for T in active_temps], G_prime_Pa=G_Pa)
+                                    if boot_res:
+                                        ci_text = f"95% bootstrap CI ({boot_res['N']} replicates): E\u2090 {boot_res['Ea_CI'][0]:.1f} \u2013 {boot_res['Ea_CI'][1]:.1f} kJ/mol"
+                                        if 'Tv_CI' in boot_res:
+                                            ci_text += f", T\u1d65 {boot_res['Tv_CI'][0]:.1f} \u2013 {boot_res['Tv_CI'][1]:.1f} \u00b0C"
+                                        st.caption(ci_text)
                                 
                             elif fit_res["Type"] == "VFT":
                                 B = fit_res["Params"]["B"]
@@ -559,10 +618,16 @@ with tab_analysis:
                 opt_alpha = st.checkbox("Auto-optimize Smoothness (L-curve)", value=True, key="opt_alpha")
                 if not opt_alpha:
                     alpha_reg = st.slider("Smoothness (\u03b1)", 1e-5, 10.0, 0.1, step=0.01, format="%.5f", key="alpha_reg")
+                    fast_preview = False
                 else:
                     alpha_reg = 0.1  # ignored
+                    fast_preview = st.checkbox("Fast Preview (SVD L-curve)", value=False, key="fast_preview",
+                                               help="Pick \u03b1 from the closed-form unconstrained L-curve, then solve once with H \u2265 0 (identity penalty only)")
                 sub_G_eq = st.checkbox("Subtract G_eq (Tail Modulus)", value=True, key="sub_G_eq")
                 n_modes = st.slider("Bins", 20, 200, 50, key="n_modes")
+                reg_label = st.selectbox("Penalty", ["Amplitude (Identity)", "Curvature (2nd Derivative)"], key="spec_reg",
+                                         help="Tikhonov operator: identity penalizes large H, 2nd derivative penalizes rough H(τ)")
+                regularization = "second_derivative" if reg_label.startswith("Curvature") else "identity"
                 
                 # We will display the L-curve details below the settings
                 st.markdown("---")
@@ -574,6 +639,8 @@ with tab_analysis:
                 "alpha_reg": alpha_reg,
                 "sub_G_eq": sub_G_eq,
                 "n_modes": n_modes,
+                "regularization": regularization,
+                "fast_preview": fast_preview,
                 "active_temps": sorted([r['Temp'] for r in active_results])
             }
             
@@ -589,8 +656,9 @@ with tab_analysis:
                     g = r['Raw']['g']  # ALWAYS use normalized modulus to avoid cache misses when scaling toggles
                     
                     tau_grid, H, last_alpha, last_G_eq = cached_compute_continuous_spectrum(
-                        t, g, num_modes=n_modes, alpha=alpha_reg, 
-                        optimize_alpha=opt_alpha, subtract_G_eq=sub_G_eq
+                        r['Raw']['fingerprint'], t, g, num_modes=n_modes, alpha=alpha_reg, 
+                        optimize_alpha=opt_alpha, subtract_G_eq=sub_G_eq,
+                        regularization=regularization, fast_preview=fast_preview
                     )
                     spec_outputs.append({
                         "Temp": r['Temp'],
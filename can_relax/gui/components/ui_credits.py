@@ -53,7 +53,7 @@ def render_credits_tab(tab_credits):
             - **Van 't Hoff Kinetics**: Temperature-dependent plateau modulus decrosslinking thermodynamics (in **MPa**)
             - **VFT & Coupled WLF-Arrhenius Kinetics**: Glass transition dynamics and dual glassy-to-chemical transition relaxation
             - **Time-Temperature Superposition (TTS)**: Mastercurve generation
-            - **Tikhonov Relaxation Spectrum**: Continuous distribution of relaxation times $H(\tau)$ using positive-constrained Ridge Regression with Hansen's L-curve corner detection and equilibration modulus ($G_{eq}$) baseline subtraction
+            - **Tikhonov Relaxation Spectrum**: Continuous distribution of relaxation times $H(\tau)$ using positivity-constrained Tikhonov regularization (active-set NNLS) with Hansen's L-curve corner detection and equilibration modulus ($G_{eq}$) baseline subtraction
             - **Statistical Model Selection**: Automated BIC and AICc selection for kinetics fits
 
             ---
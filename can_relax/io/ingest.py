@@ -0,0 +1,94 @@
+"""
+Concurrent ingestion of many exports (paths or in-memory uploads) into
+{sample: CurveSet}, parsed straight from memory without temp files.
+"""
+
+import atexit
+import logging
+import os
+import pathlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+
+from can_relax.core.curve_set import CurveSet
+from can_relax.io.parser import parse_wide_format_data
+
+logger = logging.getLogger("Ingest")
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _shared_thread_pool():
+    """One ingestion thread pool per process, reused across calls (and Streamlit reruns)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1), thread_name_prefix="can_relax-ingest")
+            atexit.register(_POOL.shutdown, wait=False)
+        return _POOL
+
+
+def _source_name(source, index):
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.basename(os.fspath(source))
+    return getattr(source, 'name', None) or f"sample_{index + 1}"
+
+
+def _materialize(source):
+    """Paths stay paths; file-like uploads are read once into bytes (picklable, re-readable)."""
+    if isinstance(source, (str, os.PathLike, bytes, bytearray, memoryview)):
+        return source
+    return source.getvalue() if hasattr(source, 'getvalue') else source.read()
+
+
+def _parse_one(source, name, sheet_name, stream=False):
+    try:
+        return parse_wide_format_data(source, stream=stream, sheet_name=sheet_name, name=name)
+    except Exception as e:
+        logger.error(f"[ERROR] [INGEST] {name}: {e}")
+        return CurveSet.from_dict({})
+
+
+def ingest_files(sources, names=None, sheet_name=None, use_processes=False, workers=None, stream=False):
+    """
+    Parses many files concurrently and returns {sample: CurveSet} in input order.
+
+    sources: file paths, bytes, or file-like objects (BytesIO, Streamlit uploads).
+    names:   optional display names; default is the file name (or .name of the upload).
+             Samples are keyed by name without suffix, de-duplicated as 'name (2)'.
+    use_processes: parse on a process pool instead of the shared thread pool (Excel
+             parsing holds the GIL); falls back to threads if the pool cannot be used.
+    workers: process count for use_processes (default: CPU count).
+    stream:  decimate delimited text files while reading (see parse_wide_format_data).
+    Files that cannot be parsed map to an empty CurveSet.
+    """
+    sources = list(sources)
+    if names is None:
+        names = [_source_name(src, i) for i, src in enumerate(sources)]
+    payloads = [_materialize(src) for src in sources]
+    sheets = [sheet_name] * len(payloads)
+    streams = [stream] * len(payloads)
+
+    parsed = None
+    if use_processes and len(payloads) > 1:
+        try:
+            n_workers = min(workers or os.cpu_count() or 1, len(payloads))
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                parsed = list(pool.map(_parse_one, payloads, names, sheets, streams))
+        except (BrokenProcessPool, PicklingError, OSError):
+            parsed = None
+    if parsed is None:
+        parsed = list(_shared_thread_pool().map(_parse_one, payloads, names, sheets, streams))
+
+    samples = {}
+    for name, curves in zip(names, parsed):
+        key = pathlib.Path(str(name)).stem or str(name)
+        base, n = key, 1
+        while key in samples:
+            n += 1
+            key = f"{base} ({n})"
+        samples[key] = curves
+    return samples
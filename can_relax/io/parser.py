@@ -1,33 +1,207 @@
+import numpy as np
 import pandas as pd
 import re
+import csv
+import codecs
+import io
+import os
 import pathlib
 import logging
+import importlib.util
+from can_relax.core.curve_set import CurveSet
+from can_relax.core.processing import LogBinDecimator
 
 # Set up a logger for this module
 logger = logging.getLogger("Parser")
 
-def _load_file_robustly(file_path):
-    """Attempt to load a file robustly as CSV or Excel."""
-    path_obj = pathlib.Path(file_path)
+# Bytes read up-front to sniff encoding / delimiter / Excel signature
+SNIFF_BYTES = 64 * 1024
+CANDIDATE_DELIMITERS = [',', ';', '\t', '|']
+# xlsx/xlsm are zip containers; legacy .xls is an OLE2 compound file
+EXCEL_SIGNATURES = (b'PK\x03\x04', b'\xd0\xcf\x11\xe0')
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+# Rows read per chunk by the streaming parser (parse_wide_format_streaming, stream=True)
+STREAM_CHUNK_ROWS = 200_000
+
+def _is_buffer(source):
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+def _readable(source):
+    """Argument for pandas/openpyxl readers: paths pass through, in-memory bytes get a fresh BytesIO."""
+    return io.BytesIO(source) if _is_buffer(source) else source
+
+def _read_prefix(source, n=SNIFF_BYTES):
+    if _is_buffer(source):
+        return bytes(source[:n])
+    with open(source, 'rb') as fh:
+        return fh.read(n)
+
+def _suffix(source, name=None):
+    """Lower-case file suffix; unnamed in-memory buffers are treated as delimited text."""
+    if name is None:
+        if _is_buffer(source):
+            return '.csv'
+        name = source
+    return pathlib.Path(str(name)).suffix.lower()
+
+def _sniff_text_format(prefix):
+    """
+    Picks (encoding, delimiter) from the first bytes of a text file.
+    UTF-8 (with or without BOM) is preferred; Latin-1 accepts any byte sequence.
+    The delimiter is the candidate that splits every sampled line into the same,
+    largest number of fields.
+    """
+    text, encoding = None, 'latin-1'
+    for enc in ('utf-8-sig', 'latin-1'):
+        try:
+            # Incremental decoding tolerates a multi-byte char cut at the prefix boundary
+            text = codecs.getincrementaldecoder(enc)().decode(prefix, final=False)
+            encoding = enc
+            break
+        except UnicodeDecodeError:
+            continue
+
+    lines = [ln for ln in text.splitlines() if ln.strip()]
+    if len(prefix) >= SNIFF_BYTES and len(lines) > 1:
+        lines = lines[:-1]  # last line may be truncated
+    lines = lines[:50]
+
+    best_delim, best_fields = ',', 0
+    for delim in CANDIDATE_DELIMITERS:
+        counts = [len(row) for row in csv.reader(lines, delimiter=delim)]
+        if not counts or min(counts) < 2:
+            continue
+        # Header and body must agree; allow ragged trailing rows in the sample
+        if counts.count(counts[0]) >= 0.9 * len(counts) and counts[0] > best_fields:
+            best_delim, best_fields = delim, counts[0]
+    return encoding, best_delim
+
+def _read_csv_fast(file_path, sep, encoding):
+    """Reads a delimited file once with a compiled engine (pyarrow if installed, else C)."""
+    if HAS_PYARROW:
+        try:
+            return pd.read_csv(_readable(file_path), sep=sep, encoding=encoding, engine='pyarrow')
+        except Exception as e:
+            logger.debug("pyarrow engine failed, using C engine: %s", e)
+    try:
+        return pd.read_csv(_readable(file_path), sep=sep, encoding=encoding, engine='c')
+    except UnicodeDecodeError:
+        # Invalid UTF-8 beyond the sniffed prefix
+        return pd.read_csv(_readable(file_path), sep=sep, encoding='latin-1', engine='c')
+
+def _excel_column_names(header):
+    """Header cells -> column names, mirroring pandas ('Unnamed: i' for blanks, 'name.1' for duplicates)."""
+    names, seen = [], {}
+    for i, cell in enumerate(header):
+        name = f"Unnamed: {i}" if cell is None or (isinstance(cell, str) and not cell.strip()) else cell
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def list_excel_sheets(file_path):
+    """Sheet names of an .xlsx workbook (path or file-like; read-only open, no cells are loaded)."""
+    import openpyxl
+    wb = openpyxl.load_workbook(_readable(file_path), read_only=True)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+def _read_excel_selective(file_path, sheet_name=None):
+    """
+    Loads only the Temp/Time/Modulus columns of one worksheet.
+    The workbook is opened in openpyxl read-only mode, the header row is classified
+    with _identify_columns, and the body rows are streamed restricted to the column
+    span that holds curves; auxiliary columns are never materialized.
+    sheet_name: sheet title or index (default: first sheet, as pd.read_excel).
+    """
+    import openpyxl
+    wb = openpyxl.load_workbook(_readable(file_path), read_only=True, data_only=True)
+    try:
+        if sheet_name is None or isinstance(sheet_name, int):
+            ws = wb.worksheets[sheet_name or 0]
+        else:
+            ws = wb[sheet_name]
+
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return pd.DataFrame()
+        names = _excel_column_names(header)
+        col_type, cols = _identify_columns(pd.DataFrame(columns=names))
+
+        needed = {p for block in _matched_blocks(cols, col_type) for p in block}
+        if not needed:
+            return pd.DataFrame(columns=names)
+
+        idx = sorted(needed)
+        lo, hi = idx[0], idx[-1]
+        data = {i: [] for i in idx}
+        for row in ws.iter_rows(min_row=2, min_col=lo + 1, max_col=hi + 1, values_only=True):
+            for i in idx:
+                data[i].append(row[i - lo] if i - lo < len(row) else None)
+    finally:
+        wb.close()
+
+    # Time/Modulus go straight to float arrays; Temp stays raw for header-style values ("120 °C")
+    frame = {}
+    for i in idx:
+        col = pd.Series(data[i], dtype=object)
+        frame[names[i]] = col if col_type[names[i]] == 'temp' else pd.to_numeric(col, errors='coerce').to_numpy(dtype=float)
+    return pd.DataFrame(frame)
+
+def _read_excel(file_path, sheet_name=None):
+    """Column-selective read for .xlsx via openpyxl; full pd.read_excel for other Excel formats."""
+    if HAS_OPENPYXL:
+        try:
+            return _read_excel_selective(file_path, sheet_name)
+        except Exception as e:
+            # Legacy .xls or a workbook openpyxl cannot stream
+            logger.debug("Read-only Excel path failed, using pd.read_excel: %s", e)
+    return pd.read_excel(_readable(file_path), sheet_name=sheet_name or 0)
+
+def _load_file_fast(file_path, sheet_name=None, suffix=None):
+    """Sniffs the file prefix once and dispatches to a single compiled-engine read."""
+    prefix = _read_prefix(file_path)
+
+    if prefix.startswith(EXCEL_SIGNATURES) or (suffix or _suffix(file_path)) not in ['.csv', '.txt']:
+        return _read_excel(file_path, sheet_name)
+
+    encoding, sep = _sniff_text_format(prefix)
+    return _read_csv_fast(file_path, sep, encoding)
+
+def _load_file_robustly(file_path, sheet_name=None, suffix=None):
+    """Attempt to load a file (path or in-memory bytes) robustly as CSV or Excel."""
+    suffix = suffix or _suffix(file_path)
     df_raw = None
 
     try:
-        if path_obj.suffix.lower() in ['.csv', '.txt']:
+        return _load_file_fast(file_path, sheet_name, suffix)
+    except Exception as e:
+        logger.debug("Fast-path load failed, falling back to sniffing reader: %s", e)
+
+    try:
+        if suffix in ['.csv', '.txt']:
             try:
                 # Try default UTF-8
-                df_raw = pd.read_csv(file_path, sep=None, engine='python')
+                df_raw = pd.read_csv(_readable(file_path), sep=None, engine='python')
             except Exception:
                 try:
                     # Try Latin-1 (Common for Excel CSVs)
-                    df_raw = pd.read_csv(file_path, sep=None, engine='python', encoding='latin-1')
+                    df_raw = pd.read_csv(_readable(file_path), sep=None, engine='python', encoding='latin-1')
                 except Exception:
                     # Try reading as Excel (in case it's an .xlsx named .csv)
                     try:
-                        df_raw = pd.read_excel(file_path)
+                        df_raw = pd.read_excel(_readable(file_path), sheet_name=sheet_name or 0)
                     except Exception as e:
                         logger.debug("Failed reading as Excel fallback: %s", e)
         else:
-            df_raw = pd.read_excel(file_path)
+            df_raw = pd.read_excel(_readable(file_path), sheet_name=sheet_name or 0)
 
     except Exception as e:
         logger.error(f"[ERROR] [PARSER] Critical failure opening file: {e}")
@@ -51,93 +225,173 @@ def _identify_columns(df_raw):
         
     return col_type, cols
 
-def _find_matching_columns(i, cols, col_type):
-    """Find the best matching Time and Modulus columns for a given Temperature column."""
-    next_temp_idx = len(cols)
-    for idx in range(i + 1, len(cols)):
-        if col_type[cols[idx]] == 'temp':
-            next_temp_idx = idx
-            break
-    
-    time_col = None
-    mod_col = None
-    
-    # Search within the block
-    for idx in range(i + 1, next_temp_idx):
-        if col_type[cols[idx]] == 'time' and time_col is None:
-            time_col = cols[idx]
-        if col_type[cols[idx]] == 'mod' and mod_col is None:
-            mod_col = cols[idx]
-            
-    # Fallback to sliding window search
-    if time_col is None:
-        best_dist = len(cols)
-        for idx in range(max(0, i - 5), min(len(cols), i + 5)):
-            if idx != i and col_type[cols[idx]] == 'time':
-                dist = abs(idx - i)
-                if dist < best_dist:
-                    best_dist = dist
-                    time_col = cols[idx]
-                    
-    if mod_col is None:
-        best_dist = len(cols)
-        for idx in range(max(0, i - 5), min(len(cols), i + 5)):
-            if idx != i and col_type[cols[idx]] == 'mod':
-                dist = abs(idx - i)
-                if dist < best_dist:
-                    best_dist = dist
-                    mod_col = cols[idx]
-                    
-    return time_col, mod_col
+# Fallback search window around a Temp column whose block lacks Time/Modulus: [i-5, i+4]
+FALLBACK_LEFT, FALLBACK_RIGHT = 5, 4
+
+def _build_block_index(cols, col_type):
+    """
+    Resolves every Temp column to its (time, modulus) column positions in one pass.
+    A Temp column's block runs up to the next Temp column; the first Time and the
+    first Modulus column inside the block are used. If the block lacks one, the
+    nearest such column within FALLBACK_LEFT/FALLBACK_RIGHT positions is taken
+    (the left one on ties). Returns [(temp_pos, time_pos, mod_pos)], None when unmatched.
+    """
+    kinds = [col_type[c] for c in cols]
+    n = len(kinds)
+
+    # Scanning right-to-left gives, for every position, the next Temp/Time/Modulus at or after it
+    next_pos = {'temp': [n] * (n + 1), 'time': [n] * (n + 1), 'mod': [n] * (n + 1)}
+    for idx in range(n - 1, -1, -1):
+        for kind, arr in next_pos.items():
+            arr[idx] = idx if kinds[idx] == kind else arr[idx + 1]
+
+    def nearest(i, kind):
+        for d in range(1, FALLBACK_LEFT + 1):
+            if i - d >= 0 and kinds[i - d] == kind:
+                return i - d
+            if d <= FALLBACK_RIGHT and i + d < n and kinds[i + d] == kind:
+                return i + d
+        return None
+
+    blocks = []
+    for i, kind in enumerate(kinds):
+        if kind != 'temp':
+            continue
+        block_end = next_pos['temp'][i + 1]
+        time_pos = next_pos['time'][i + 1]
+        mod_pos = next_pos['mod'][i + 1]
+        time_pos = time_pos if time_pos < block_end else nearest(i, 'time')
+        mod_pos = mod_pos if mod_pos < block_end else nearest(i, 'mod')
+        blocks.append((i, time_pos, mod_pos))
+    return blocks
+
+def _matched_blocks(cols, col_type):
+    """Blocks with both a Time and a Modulus column."""
+    return [b for b in _build_block_index(cols, col_type) if b[1] is not None and b[2] is not None]
+
+def _parse_temperature(value):
+    nums = re.findall(r"[-+]?\d*\.\d+|\d+", str(value))
+    return float(nums[0]) if nums else None
 
 def _extract_curves(df_raw, col_type, cols):
-    """Extract valid Temp/Time/Modulus curves from the raw dataframe."""
+    """
+    Extract valid Temp/Time/Modulus curves from the raw dataframe.
+    All Time/Modulus columns are converted to one float array in a single pass;
+    each block is then a boolean row mask over that array.
+    """
     curves = {}
     logger.info(f"[PARSER] Scanning {len(cols)} columns...")
-    
-    for i, c in enumerate(cols):
-        if col_type[c] != 'temp': continue
-        
-        time_col, mod_col = _find_matching_columns(i, cols, col_type)
-        
-        if time_col and mod_col:
-            temp_val = None
-            try:
-                sub_df = df_raw[[c, time_col, mod_col]].dropna().copy()
-                sub_df.columns = ['Temp', 'Time', 'Modulus']
-                
-                val_str = str(sub_df['Temp'].iloc[0])
-                nums = re.findall(r"[-+]?\d*\.\d+|\d+", val_str)
-                
-                if nums:
-                    temp_val = float(nums[0])
-                    sub_df['Time'] = pd.to_numeric(sub_df['Time'], errors='coerce')
-                    sub_df['Modulus'] = pd.to_numeric(sub_df['Modulus'], errors='coerce')
-                    final_df = sub_df[['Time', 'Modulus']].dropna()
-                    
-                    if not final_df.empty:
-                        curves[temp_val] = final_df
-                        logger.info(f"  [OK] Found curve: {temp_val}C")
-            except Exception as e:
-                logger.debug("Failed extracting curve for %s: %s", temp_val, e)
+    blocks = _matched_blocks(cols, col_type)
+
+    if blocks:
+        all_pos = sorted({p for block in blocks for p in block})
+        num_pos = sorted({p for _, t, m in blocks for p in (t, m)})
+        present_of = {p: k for k, p in enumerate(all_pos)}
+        col_of = {p: k for k, p in enumerate(num_pos)}
+        present = df_raw.iloc[:, all_pos].notna().to_numpy()
+        numeric = df_raw.iloc[:, num_pos]
+        if not all(pd.api.types.is_numeric_dtype(dt) for dt in numeric.dtypes):
+            numeric = numeric.apply(pd.to_numeric, errors='coerce')
+        values = numeric.to_numpy(dtype=float, na_value=np.nan)
+        is_num = ~np.isnan(values)
+
+    for temp_pos, time_pos, mod_pos in blocks:
+        temp_val = None
+        try:
+            t_k, m_k = col_of[time_pos], col_of[mod_pos]
+            # Rows with all three cells filled; the temperature is read from the first of them
+            rows = present[:, present_of[temp_pos]] & present[:, present_of[time_pos]] & present[:, present_of[mod_pos]]
+            first = np.argmax(rows)
+            if not rows[first]:
                 continue
+            temp_val = _parse_temperature(df_raw.iat[first, temp_pos])
+
+            if temp_val is not None:
+                keep = rows & is_num[:, t_k] & is_num[:, m_k]
+                if keep.any():
+                    curves[temp_val] = pd.DataFrame({'Time': values[keep, t_k], 'Modulus': values[keep, m_k]})
+                    logger.info(f"  [OK] Found curve: {temp_val}C")
+        except Exception as e:
+            logger.debug("Failed extracting curve for %s: %s", temp_val, e)
+            continue
                 
     if not curves:
         logger.warning(f"[PARSER] No curves found. Columns detected: {cols}")
         
     return curves
 
-def parse_wide_format_data(file_path):
+def parse_wide_format_streaming(file_path, chunksize=STREAM_CHUNK_ROWS, bins_per_decade=100):
+    """
+    Memory-bounded parse of a delimited wide-format file.
+    Only the header is read up front to resolve the Temp/Time/Modulus column groups;
+    the body is then read in chunks restricted to those columns, and each curve is fed
+    to a LogBinDecimator, so the full-resolution curves are never held in memory.
+    Bins are anchored at each curve's first sample (LogBinDecimator(relative=True)),
+    matching the time axis trim_curve fits on when the curve relaxes from its first row.
+    Returns a CurveSet of bin-averaged curves (same shape as parse_wide_format_data).
+    """
+    encoding, sep = _sniff_text_format(_read_prefix(file_path))
+
+    header = pd.read_csv(_readable(file_path), sep=sep, encoding=encoding, nrows=0)
+    col_type, cols = _identify_columns(header)
+    blocks = _matched_blocks(cols, col_type)
+    groups = [[cols[i], cols[t], cols[m], None, LogBinDecimator(bins_per_decade, relative=True)] for i, t, m in blocks]
+    if not groups:
+        logger.warning(f"[PARSER] No curves found. Columns detected: {cols}")
+        return CurveSet.from_dict({})
+
+    needed = [cols[p] for p in sorted({p for block in blocks for p in block})]
+    logger.info(f"[PARSER] Streaming {len(groups)} curves in chunks of {chunksize} rows...")
+    reader = pd.read_csv(_readable(file_path), sep=sep, encoding=encoding, usecols=needed, chunksize=chunksize,
+                         dtype={g[0]: str for g in groups}, engine='c', encoding_errors='replace')
+    for chunk in reader:
+        for group in groups:
+            temp_col, time_col, mod_col, temp_val, decimator = group
+            sub = chunk[[temp_col, time_col, mod_col]].dropna()
+            if sub.empty:
+                continue
+            if temp_val is None:
+                group[3] = temp_val = _parse_temperature(sub[temp_col].iloc[0])
+            decimator.update(pd.to_numeric(sub[time_col], errors='coerce').to_numpy(dtype=float),
+                             pd.to_numeric(sub[mod_col], errors='coerce').to_numpy(dtype=float))
+
+    curves = {}
+    for _, _, _, temp_val, decimator in groups:
+        if temp_val is not None and len(decimator):
+            t, g = decimator.result()
+            curves[temp_val] = pd.DataFrame({'Time': t, 'Modulus': g})
+            logger.info(f"  [OK] Found curve: {temp_val}C ({decimator.n_samples} samples -> {len(t)} bins)")
+    return CurveSet.from_dict(curves)
+
+def parse_wide_format_data(file_path, stream=False, sheet_name=None, name=None):
     """
-    Robustly parses a wide-format file (CSV/XLSX) into a dictionary of DataFrames.
-    Returns: { temperature_float: pd.DataFrame(columns=['Time', 'Modulus']) }
+    Robustly parses a wide-format file (CSV/XLSX) into a CurveSet.
+    The CurveSet behaves like { temperature_float: pd.DataFrame(columns=['Time', 'Modulus']) }
+    and each curve carries a content Fingerprint in df.attrs['fingerprint'] for cheap cache keys.
+    stream: parse delimited text with parse_wide_format_streaming (bin-averaged curves in
+            bounded memory). Opt-in only, since decimation changes the fitted data.
+    sheet_name: worksheet title or index for Excel input (default: first sheet).
+    file_path may also be in-memory content (bytes or a file-like object such as BytesIO
+    or a Streamlit upload); name is then the original file name, used for its suffix.
     """
-    df_raw = _load_file_robustly(file_path)
+    if hasattr(file_path, 'read'):
+        if name is None:
+            name = getattr(file_path, 'name', None)
+        file_path = file_path.getvalue() if hasattr(file_path, 'getvalue') else file_path.read()
+    suffix = _suffix(file_path, name)
+
+    if stream:
+        try:
+            return parse_wide_format_streaming(file_path)
+        except Exception as e:
+            logger.warning("Streaming parse failed, reading the whole file: %s", e)
+
+    df_raw = _load_file_robustly(file_path, sheet_name, suffix)
     if df_raw is None:
         logger.error("[ERROR] [PARSER] Could not read file. Checked UTF-8, Latin-1, and Excel formats.")
-        return {}
+        return CurveSet.from_dict({})
 
     col_type, cols = _identify_columns(df_raw)
     curves = _extract_curves(df_raw, col_type, cols)
     
-    return curves
\ No newline at end of file
+    return CurveSet.from_dict(curves)
\ No newline at end of file
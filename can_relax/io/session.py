@@ -0,0 +1,173 @@
+"""
+Binary session bundles: parsed curves, fit results, spectra and mastercurves.
+
+A session is a directory holding manifest.json plus one .npy blob per array dtype.
+The manifest mirrors the saved objects (dicts, lists, scalars, strings) and points
+into the blobs for every NumPy array, so load_session can memory-map the blobs
+and hand out read-only views: large sessions open instantly and only the curves
+that are actually looked at are paged in.
+"""
+
+import json
+import logging
+import os
+import pathlib
+import uuid
+import numpy as np
+import pandas as pd
+
+from can_relax import __version__
+from can_relax.core.curve_set import CurveSet
+from can_relax.core.fingerprint import Fingerprint
+
+logger = logging.getLogger("Session")
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 1
+
+
+class _Encoder:
+    """Walks a nested object once, replacing arrays by blob references."""
+
+    def __init__(self):
+        self.chunks = {}   # dtype str -> list of flat arrays
+        self.sizes = {}    # dtype str -> elements queued so far
+
+    def array(self, arr):
+        arr = np.asarray(arr)
+        if arr.dtype.kind not in 'biuf':
+            # Strings/objects are small metadata; keep them in the manifest
+            return {'__list__': self.encode(arr.tolist())}
+        key = arr.dtype.str
+        offset = self.sizes.get(key, 0)
+        self.chunks.setdefault(key, []).append(arr.ravel())
+        self.sizes[key] = offset + arr.size
+        return {'__ndarray__': [key, offset, list(arr.shape)]}
+
+    def encode(self, obj):
+        if isinstance(obj, CurveSet):
+            packed = {
+                'temps': self.array(obj.temps), 'time': self.array(obj.time),
+                'modulus': self.array(obj.modulus), 'offsets': self.array(obj.offsets),
+                'fingerprints': [self.encode(fp) for fp in obj.fingerprints]}
+            if obj.sigma is not None:
+                packed['sigma'] = self.array(obj.sigma)
+            return {'__curveset__': packed}
+        if isinstance(obj, Fingerprint):
+            return {'__fingerprint__': [obj.digest, obj.n_rows]}
+        if isinstance(obj, pd.DataFrame):
+            return {'__dataframe__': [[str(c), self.array(obj[c].to_numpy())] for c in obj.columns]}
+        if isinstance(obj, np.ndarray):
+            return self.array(obj)
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, dict):
+            if all(isinstance(k, str) for k in obj):
+                return {k: self.encode(v) for k, v in obj.items()}
+            # Non-string keys (temperatures) would be stringified by JSON
+            return {'__dict__': [[self.encode(k), self.encode(v)] for k, v in obj.items()]}
+        if isinstance(obj, tuple):
+            return {'__tuple__': [self.encode(v) for v in obj]}
+        if isinstance(obj, list):
+            return [self.encode(v) for v in obj]
+        if obj is None or isinstance(obj, (bool, int, float, str)):
+            return obj
+        raise TypeError(f"Cannot store {type(obj).__name__} in a session")
+
+
+def _blob_name(dtype_str, token):
+    return f"blob_{token}_{np.dtype(dtype_str).name}.npy"
+
+
+def save_session(path, **parts):
+    """
+    Writes the given named parts (e.g. curves=CurveSet, results=[...], spectra=[...],
+    mastercurve={...}) to the session directory `path`, replacing an existing session.
+
+    The new blobs get names unique to this save and the manifest is swapped in with
+    os.replace, so the previous session stays intact until the new one is complete.
+    Old blobs are removed afterwards; blobs that are still memory-mapped (Windows
+    refuses to delete them) are left behind and removed by a later save.
+    """
+    root = pathlib.Path(path)
+    root.mkdir(parents=True, exist_ok=True)
+    token = uuid.uuid4().hex[:12]
+    enc = _Encoder()
+    body = {name: enc.encode(value) for name, value in parts.items()}
+
+    blobs = {}
+    for key, chunks in enc.chunks.items():
+        name = _blob_name(key, token)
+        blobs[key] = name
+        if enc.sizes[key] == 0:
+            np.save(root / name, np.empty(0, dtype=np.dtype(key)))
+            continue
+        # Fill the blob through a memmap so the arrays are never concatenated in RAM
+        out = np.lib.format.open_memmap(root / name, mode='w+', dtype=np.dtype(key), shape=(enc.sizes[key],))
+        pos = 0
+        for chunk in chunks:
+            out[pos:pos + chunk.size] = chunk
+            pos += chunk.size
+        out.flush()
+        del out
+
+    manifest = {'format': FORMAT_VERSION, 'can_relax': __version__, 'blobs': blobs, 'parts': body}
+    tmp = root / f"{MANIFEST}.{token}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(tmp, root / MANIFEST)
+
+    for stale in root.glob('blob_*.npy'):
+        if stale.name not in blobs.values():
+            try:
+                stale.unlink()
+            except PermissionError:
+                logger.info("Keeping %s: still in use", stale.name)
+    logger.info("Saved session %s (%d blobs)", root, len(blobs))
+
+
+def load_session(path, mmap=True):
+    """
+    Reads a session written by save_session and returns {part_name: object}.
+    With mmap=True arrays are read-only views into memory-mapped blobs.
+    """
+    root = pathlib.Path(path)
+    with open(root / MANIFEST, encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported session format: {manifest.get('format')}")
+
+    blobs = {key: np.load(root / name, mmap_mode='r' if mmap else None)
+             for key, name in manifest['blobs'].items()}
+
+    def array(ref):
+        key, offset, shape = ref
+        size = int(np.prod(shape, dtype=np.int64))
+        return np.asarray(blobs[key][offset:offset + size]).reshape(shape)
+
+    def decode(obj):
+        if isinstance(obj, list):
+            return [decode(v) for v in obj]
+        if not isinstance(obj, dict):
+            return obj
+        if len(obj) == 1:
+            (tag, val), = obj.items()
+            if tag == '__ndarray__':
+                return array(val)
+            if tag == '__curveset__':
+                return CurveSet(decode(val['temps']), decode(val['time']), decode(val['modulus']),
+                                decode(val['offsets']), [decode(fp) for fp in val['fingerprints']],
+                                sigma=decode(val['sigma']) if 'sigma' in val else None)
+            if tag == '__fingerprint__':
+                return Fingerprint(*val)
+            if tag == '__dataframe__':
+                return pd.DataFrame({c: decode(v) for c, v in val}, copy=False)
+            if tag == '__dict__':
+                return {decode(k): decode(v) for k, v in val}
+            if tag == '__tuple__':
+                return tuple(decode(v) for v in val)
+            if tag == '__list__':
+                return np.array(decode(val))
+        return {k: decode(v) for k, v in obj.items()}
+
+    return {name: decode(value) for name, value in manifest['parts'].items()}
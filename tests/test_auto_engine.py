@@ -0,0 +1,58 @@
+"""
+Tests for signal-quality scoring (can_relax.core.auto_engine).
+"""
+import numpy as np
+import pandas as pd
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.auto_engine import AutoEngine
+from can_relax.core.curve_set import CurveSet
+from can_relax.core.processing import DataProcessor
+
+
+def test_batch_scores_match_single_curve_scores():
+    engine = AutoEngine()
+    rng = np.random.default_rng(3)
+    pairs = []
+    for n in [3, 6, 9, 10, 40, 250]:
+        t = np.logspace(-2, 3, n)
+        pairs.append((t, np.exp(-t / 50) + rng.normal(0, 0.01, n)))
+    pairs.append((np.arange(20.0), np.full(20, 1.0)))  # no relaxation
+    scores = engine.score_curves(pairs)
+    assert set(scores) == {'noise', 'range', 'wiggle', 'quality'}
+    for i, (t, g) in enumerate(pairs):
+        assert scores['quality'][i] == engine.compute_signal_quality(t, g)
+        assert 0.0 <= scores['quality'][i] <= 1.0
+    assert scores['quality'][0] == 0.0 and scores['range'][-1] == 0.0
+
+
+
+def test_curve_set_scores_trimmed_normalized_curves():
+    engine = AutoEngine()
+    t = np.logspace(-2, 4, 300)
+    raw = {120.0: 2e6 * np.exp(-t / 50), 130.0: 2e6 * np.exp(-t / 1e7), 140.0: 2e6 * np.exp(-t[:4] / 50)}
+    cs = CurveSet.from_dict({T: pd.DataFrame({'Time': t[:len(g)], 'Modulus': g}) for T, g in raw.items()})
+    processor = DataProcessor()
+    expected = []
+    for g in raw.values():
+        tt, gg, _ = processor.trim_curve(t[:len(g)], g)
+        expected.append(0.0 if tt is None else engine.compute_signal_quality(tt, gg))
+    np.testing.assert_allclose(engine.score_curves(cs)['quality'], expected)
+    # Raw Pa values would score every curve the same; trimmed ones separate relaxing from flat
+    assert expected[0] > 0.9 and expected[1] < 0.7 and expected[2] == 0.0
+
+
+def test_min_quality_rejects_before_fitting():
+    t = np.logspace(0, 4, 120)
+    clean = np.exp(-t / 300)
+    noisy = clean + np.random.default_rng(0).normal(0, 0.15, t.size)
+    curves = {120.0: pd.DataFrame({'Time': t, 'Modulus': clean}),
+              130.0: pd.DataFrame({'Time': t, 'Modulus': np.abs(noisy) + 1e-3})}
+
+    analyzer = CurveAnalyzer(min_quality=0.6)
+    batched = analyzer.fit_many(curves, fit_model='Maxwell')
+    single = [analyzer.fit_one_temp(T, df, fit_model='Maxwell') for T, df in curves.items()]
+    for results in (batched, single):
+        assert results[0]['Valid'] and set(results[0]['Quality_Components']) == {'noise', 'range', 'wiggle'}
+        assert not results[1]['Valid'] and results[1]['Reason'].startswith('Low signal quality')
+        assert 'Fits' not in results[1]
+    assert CurveAnalyzer().fit_many(curves, fit_model='Maxwell')[1]['Valid']
@@ -0,0 +1,97 @@
+"""
+Tests for fit uncertainties: covariance-based perr, the batched bootstrap
+(can_relax.core.bootstrap, CurveAnalyzer.bootstrap) and its propagation to Ea/Tv.
+"""
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import curve_fit
+from can_relax.core import analyzer as analyzer_module
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.bootstrap import bootstrap_fit, summarize
+from can_relax.core.kinetics import KineticsEngine, R_GAS, tv_from_arrhenius
+from can_relax.core.models import SingleKWW
+
+
+def _noisy_kww(tau, beta=0.6, noise=0.01, seed=0):
+    t = np.logspace(-1, 4, 120)
+    g = SingleKWW().func(t, tau, beta) + noise * np.random.default_rng(seed).standard_normal(len(t))
+    return t, g
+
+
+def test_bootstrap_interval_covers_true_tau_and_matches_covariance():
+    model = SingleKWW()
+    t, g = _noisy_kww(100.0)
+    popt, pcov = curve_fit(model.func, t, g, p0=model.get_initial_guess(t, g), bounds=model.get_bounds())
+    samples = bootstrap_fit(model, t, g, popt, n_boot=500, kind='parametric', seed=1)
+    assert len(samples) > 450
+    stats = summarize(samples)
+    assert stats['ci_low'][0] < 100.0 < stats['ci_high'][0]
+    np.testing.assert_allclose(stats['std'], np.sqrt(np.diag(pcov)), rtol=0.3)
+
+
+def test_bootstrap_rejects_unknown_kind():
+    t, g = _noisy_kww(100.0)
+    with pytest.raises(ValueError):
+        bootstrap_fit(SingleKWW(), t, g, [100.0, 0.6], kind='jackknife')
+
+
+def test_arrhenius_bootstrap_recovers_ea():
+    Ea_true = 80.0
+    temps = [140.0, 160.0, 180.0, 200.0]
+    rng = np.random.default_rng(0)
+    taus = [1e-8 * np.exp(Ea_true * 1000 / (R_GAS * (T + 273.15))) for T in temps]
+    samples = [tau * np.exp(0.05 * rng.standard_normal(800)) for tau in taus]
+    res = KineticsEngine().arrhenius_bootstrap(temps, samples, G_prime_Pa=1e6)
+    assert res['Ea_CI'][0] < Ea_true < res['Ea_CI'][1]
+    assert res['Ea'] == pytest.approx(Ea_true, rel=0.05)
+    slope = Ea_true * 1000 / R_GAS
+    assert res['Tv_CI'][0] < tv_from_arrhenius(slope, np.log(1e-8), 1e6) < res['Tv_CI'][1]
+
+
+def test_analyzer_reports_perr_and_bootstrap_serial_and_parallel():
+    curves = {}
+    for k, T in enumerate([150.0, 170.0]):
+        t, g = _noisy_kww(200.0 / (k + 1), seed=k)
+        curves[T] = pd.DataFrame({'Time': t, 'Modulus': 1e6 * g})
+    analyzer = CurveAnalyzer()
+    results = analyzer.fit_all(curves, fit_model='Single_KWW', workers=1)
+    for r in results:
+        fit = r['Fits']['Single_KWW']
+        assert fit['pcov'].shape == (2, 2)
+        assert np.all(fit['perr'] > 0)
+
+    serial = analyzer.bootstrap(results, n_boot=200, workers=1)
+    taus = [r['Bootstrap']['Tau_CI'] for r in serial]
+    for r, (lo, hi) in zip(serial, taus):
+        assert lo < r['Fits']['Single_KWW']['popt'][0] < hi
+        assert r['Bootstrap']['Perr'][0] == pytest.approx(r['Fits']['Single_KWW']['perr'][0], rel=0.4)
+        assert r['Bootstrap']['N'] + r['Bootstrap']['N_Failed'] == 200
+
+    fresh = [{k: v for k, v in r.items() if k != 'Bootstrap'} for r in results]
+    parallel = analyzer.bootstrap(fresh, n_boot=200, workers=2)
+    for r, ci in zip(parallel, taus):
+        assert r['Bootstrap']['Tau_CI'] == pytest.approx(ci)
+
+
+def test_replicates_the_batched_solver_misses_are_refitted():
+    model = SingleKWW()
+    t, g = _noisy_kww(100.0)
+    popt, _ = curve_fit(model.func, t, g, p0=model.get_initial_guess(t, g), bounds=model.get_bounds())
+    batched = bootstrap_fit(model, t, g, popt, n_boot=40, seed=2)
+    # One LM iteration converges nothing, so every replicate goes through the TRF refit
+    refitted = bootstrap_fit(model, t, g, popt, n_boot=40, seed=2, max_iter=1)
+    assert len(refitted) == len(batched) == 40
+    np.testing.assert_allclose(refitted, batched, rtol=1e-3)
+
+
+def test_bootstrap_withholds_intervals_when_too_many_refits_fail(monkeypatch, caplog):
+    t, g = _noisy_kww(100.0)
+    analyzer = CurveAnalyzer()
+    result = analyzer.fit_one_temp(150.0, pd.DataFrame({'Time': t, 'Modulus': 1e6 * g}), fit_model='Single_KWW')
+    fit = analyzer_module.bootstrap_fit
+    monkeypatch.setattr(analyzer_module, 'bootstrap_fit', lambda *a, **kw: fit(*a, **kw)[:80])
+    with caplog.at_level(logging.WARNING, logger="Analyzer"):
+        assert analyzer.bootstrap_one(result, n_boot=100) is None
+    assert "20 of 100" in caplog.text
@@ -0,0 +1,94 @@
+"""
+Tests for the headless batch pipeline (python -m can_relax).
+"""
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from can_relax.cli import expand_inputs, main, run_batch
+from can_relax.io import ingest
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.result_cache import ResultCache
+
+
+def _write_export(path, taus):
+    t = np.logspace(0, 4, 80)
+    cols = {}
+    for i, (temp, tau) in enumerate(taus.items()):
+        cols[f'Temp_{i}'] = [temp] * len(t)
+        cols[f'Time_{i}'] = t
+        cols[f'Modulus_{i}'] = 2.0 * np.exp(-(t / tau) ** 0.8)
+    pd.DataFrame(cols).to_csv(path, index=False)
+
+
+def test_cli_writes_consolidated_table(tmp_path):
+    _write_export(tmp_path / 'a.csv', {120: 2000.0, 140: 400.0, 160: 100.0})
+    _write_export(tmp_path / 'b.csv', {130: 900.0, 150: 200.0})
+    out = tmp_path / 'results.csv'
+
+    assert main([str(tmp_path), '-o', str(out), '--model', 'Single_KWW', '-j', '1', '--no-cache']) == 0
+
+    table = pd.read_csv(out)
+    assert list(table['File'].unique()) == ['a.csv', 'b.csv']
+    assert table['Valid'].all()
+    a = table[table['File'] == 'a.csv']
+    assert a['Tau_s'].tolist() == pytest.approx([2000.0, 400.0, 100.0], rel=0.05)
+    assert np.isfinite(a['Ea_kJmol']).all()
+
+
+def test_expand_inputs_filters_and_sorts(tmp_path):
+    for name in ['b.csv', 'a.xlsx', 'notes.md']:
+        (tmp_path / name).write_text('x')
+    assert [p.split('/')[-1] for p in expand_inputs([str(tmp_path / '*')])] == ['a.xlsx', 'b.csv']
+
+
+def test_cli_does_not_import_gui_stack():
+    code = ("import sys, can_relax.cli; "
+            "bad = [m for m in ('streamlit', 'plotly', 'matplotlib') if m in sys.modules]; "
+            "sys.exit(1 if bad else 0)")
+    assert subprocess.run([sys.executable, '-c', code]).returncode == 0
+
+
+def test_cli_populates_result_cache(tmp_path):
+    _write_export(tmp_path / 'a.csv', {120: 2000.0, 140: 400.0})
+    cache_dir = tmp_path / 'cache'
+    args = [str(tmp_path / 'a.csv'), '-o', str(tmp_path / 'r.csv'), '-j', '1', '--cache-dir', str(cache_dir)]
+    assert main(args) == 0
+    assert ResultCache(cache_dir / 'results.sqlite').total_bytes() > 0
+    first = pd.read_csv(tmp_path / 'r.csv')
+    assert main(args) == 0
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'r.csv'), first)
+
+
+def test_cli_stream_flag_decimates_long_logs(tmp_path, monkeypatch):
+    t = np.linspace(1.0, 1e4, 20_000)
+    pd.DataFrame({'Temp_0': 140, 'Time_0': t, 'Modulus_0': 2.0 * np.exp(-(t / 400.0) ** 0.8)}).to_csv(tmp_path / 'long.csv', index=False)
+    lengths = []
+    fit_all = CurveAnalyzer.fit_all
+
+    def recording_fit_all(self, curves, **kwargs):
+        lengths.append(curves.lengths())
+        return fit_all(self, curves, **kwargs)
+    monkeypatch.setattr(CurveAnalyzer, 'fit_all', recording_fit_all)
+
+    for extra in ([], ['--stream']):
+        out = tmp_path / 'r.csv'
+        assert main([str(tmp_path / 'long.csv'), '-o', str(out), '--model', 'Single_KWW', '-j', '1', '--no-cache'] + extra) == 0
+        assert pd.read_csv(out)['Tau_s'].iloc[0] == pytest.approx(400.0, rel=0.05)
+    assert lengths[0][0] == 20_000 and lengths[1][0] < 1_000
+
+
+def test_run_batch_ingests_all_files_before_fitting(tmp_path):
+    _write_export(tmp_path / 'a.csv', {120: 2000.0, 140: 400.0})
+    _write_export(tmp_path / 'b.csv', {130: 900.0, 150: 200.0})
+    (tmp_path / 'broken.csv').write_text('not,a\nvalid,file')
+    files = expand_inputs([str(tmp_path)])
+
+    serial = run_batch(files, fit_model='Single_KWW', workers=1)  # shared ingestion thread pool
+    assert ingest._POOL is not None
+    parallel = run_batch(files, fit_model='Single_KWW', workers=2)  # process pools for parsing and fitting
+    pd.testing.assert_frame_equal(serial, parallel)
+    assert serial['File'].tolist() == ['a.csv', 'a.csv', 'b.csv', 'b.csv', 'broken.csv']
+    assert serial['Valid'].tolist() == [True] * 4 + [False]
+    assert serial['Reason'].iloc[-1].startswith('Parsing failed')
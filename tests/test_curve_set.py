@@ -0,0 +1,58 @@
+"""
+Tests for the ragged columnar curve store (can_relax.core.curve_set).
+"""
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from can_relax.core.curve_set import CurveSet
+from can_relax.core.fingerprint import curve_fingerprint
+from can_relax.core.analyzer import CurveAnalyzer
+
+
+def _curves():
+    out = {}
+    for temp, n, tau in [(120.0, 40, 500.0), (140.0, 60, 100.0), (160.0, 25, 20.0)]:
+        t = np.logspace(0, 3, n)
+        out[temp] = pd.DataFrame({'Time': t, 'Modulus': np.exp(-t / tau)})
+    return out
+
+
+def test_views_share_the_contiguous_buffer():
+    curves = _curves()
+    cs = CurveSet.from_dict(curves)
+    assert list(cs) == [120.0, 140.0, 160.0] and len(cs) == 3
+    assert cs.lengths().tolist() == [40, 60, 25]
+    t, g = cs.arrays(140.0)
+    assert np.shares_memory(t, cs.time) and np.shares_memory(g, cs.modulus)
+    np.testing.assert_array_equal(g, curves[140.0]['Modulus'].to_numpy())
+    df = cs[160.0]
+    assert np.shares_memory(df['Time'].to_numpy(), cs.time)
+    assert not t.flags.writeable
+
+
+def test_dict_interface_and_fingerprints_match_dataframes():
+    curves = _curves()
+    cs = CurveSet.from_dict(curves)
+    assert 120 in cs and 130.0 not in cs
+    for temp, df in cs.items():
+        pd.testing.assert_frame_equal(df, curves[temp])
+        assert curve_fingerprint(df) == curve_fingerprint(curves[temp].copy())
+    with pytest.raises(KeyError):
+        cs[999.0]
+    assert not CurveSet.from_dict({})
+
+
+def test_float32_storage_and_pickling():
+    cs = CurveSet.from_dict(_curves(), dtype=np.float32)
+    assert cs.time.dtype == np.float32 and cs.nbytes < CurveSet.from_dict(_curves()).nbytes
+    clone = pickle.loads(pickle.dumps(cs))
+    np.testing.assert_array_equal(clone.arrays(120.0)[0], cs.arrays(120.0)[0])
+    assert clone.fingerprint(140.0) == cs.fingerprint(140.0)
+
+
+def test_analyzer_accepts_curve_set():
+    cs = CurveSet.from_dict(_curves())
+    analyzer = CurveAnalyzer()
+    assert [r['Temp'] for r in analyzer.fit_many(cs, fit_model='Maxwell')] == [120.0, 140.0, 160.0]
+    assert [r['Valid'] for r in analyzer.fit_all(cs, fit_model='Maxwell', workers=1)] == [True] * 3
@@ -0,0 +1,66 @@
+"""
+Tests for content fingerprints (can_relax.core.fingerprint).
+"""
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.curve_set import CurveSet
+from can_relax.core.fingerprint import Fingerprint, attach_fingerprint, curve_fingerprint, curves_fingerprint, fingerprint_arrays
+from can_relax.core.result_cache import ResultCache
+from can_relax.io.parser import parse_wide_format_data
+
+
+def _df(n=50, scale=1.0):
+    t = np.logspace(0, 3, n)
+    return pd.DataFrame({'Time': t, 'Modulus': scale * np.exp(-t / 100)})
+
+
+def test_fingerprint_tracks_content_dtype_and_shape():
+    a = np.linspace(0, 1, 10)
+    assert fingerprint_arrays(a) == fingerprint_arrays(a.copy())
+    assert fingerprint_arrays(a) != fingerprint_arrays(a.astype(np.float32))
+    assert fingerprint_arrays(a) != fingerprint_arrays(a.reshape(2, 5))
+    b = a.copy()
+    b[3] += 1e-15
+    assert fingerprint_arrays(a) != fingerprint_arrays(b)
+    fp = fingerprint_arrays(a)
+    assert pickle.loads(pickle.dumps(fp)) == fp and hash(pickle.loads(pickle.dumps(fp))) == hash(fp)
+
+
+def test_fingerprint_is_reused_only_for_curve_set_buffers():
+    curves = CurveSet.from_dict({120.0: _df()})
+    df = curves[120.0]
+    fp = df.attrs['fingerprint']
+    assert curve_fingerprint(df) is fp
+    # attrs propagate through filtering, copies and arithmetic; the old digest must not be reused
+    assert curve_fingerprint(df[df['Time'] > 10]) != fp
+    scaled = df.copy()
+    scaled['Modulus'] *= 1e6
+    assert curve_fingerprint(scaled) != fp
+    # A plain pandas-owned frame can change in place, so its digest is always recomputed
+    plain = attach_fingerprint(_df())
+    plain.loc[0, 'Modulus'] = 5.0
+    assert curve_fingerprint(plain) == fingerprint_arrays(plain['Time'].to_numpy(), plain['Modulus'].to_numpy())
+    assert curves_fingerprint({1.0: df}) != curves_fingerprint({2.0: df})
+
+
+def test_stale_fingerprint_does_not_return_a_cached_fit(tmp_path):
+    cache = ResultCache(tmp_path / 'c.sqlite')
+    df = CurveSet.from_dict({150.0: _df()})[150.0]
+    analyzer = CurveAnalyzer(cache=cache)
+    first = analyzer.fit_one_temp(150.0, df, fit_model='Maxwell')
+    scaled = df.copy()
+    scaled['Modulus'] *= 1e6
+    second = analyzer.fit_one_temp(150.0, scaled, fit_model='Maxwell')
+    assert second['Raw']['G0'] == pytest.approx(1e6 * first['Raw']['G0'])
+
+
+def test_parser_attaches_fingerprints(tmp_path):
+    t = np.logspace(0, 3, 30)
+    pd.DataFrame({'Temp': [120] * 30, 'Time': t, 'Modulus': np.exp(-t / 50)}).to_csv(tmp_path / 'd.csv', index=False)
+    curves = parse_wide_format_data(str(tmp_path / 'd.csv'))
+    df = curves[120.0]
+    assert isinstance(df.attrs['fingerprint'], Fingerprint)
+    assert df.attrs['fingerprint'] == fingerprint_arrays(df['Time'].to_numpy(), df['Modulus'].to_numpy())
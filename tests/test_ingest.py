@@ -0,0 +1,60 @@
+"""
+Tests for concurrent multi-file ingestion (can_relax.io.ingest).
+"""
+import io
+import numpy as np
+import pandas as pd
+from can_relax.io.ingest import ingest_files
+from can_relax.io.parser import parse_wide_format_data
+
+
+def _csv_bytes(temps, sep=','):
+    t = np.logspace(-1, 3, 30)
+    cols = {}
+    for i, temp in enumerate(temps):
+        cols[f'Temp_{i}'] = temp
+        cols[f'Time_{i}'] = t
+        cols[f'Modulus_{i}'] = np.exp(-t / temp)
+    return pd.DataFrame(cols).to_csv(index=False, sep=sep).encode()
+
+
+class _Upload(io.BytesIO):
+    """Stand-in for a Streamlit UploadedFile (BytesIO with a name)."""
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def test_parse_from_memory_matches_file(tmp_path):
+    data = _csv_bytes([120, 140], sep=';')
+    (tmp_path / 'a.csv').write_bytes(data)
+    from_file = parse_wide_format_data(str(tmp_path / 'a.csv'))
+    from_bytes = parse_wide_format_data(data)
+    from_upload = parse_wide_format_data(_Upload(data, 'a.csv'))
+    assert list(from_file) == list(from_bytes) == list(from_upload) == [120.0, 140.0]
+    assert from_bytes.fingerprint(140.0) == from_file.fingerprint(140.0)
+
+    xlsx = io.BytesIO()
+    pd.read_csv(io.BytesIO(data), sep=';').to_excel(xlsx, index=False)
+    assert list(parse_wide_format_data(xlsx.getvalue(), name='a.xlsx')) == [120.0, 140.0]
+
+
+def test_ingest_many_sources_in_order(tmp_path):
+    (tmp_path / 'S1.csv').write_bytes(_csv_bytes([100, 110]))
+    sources = [str(tmp_path / 'S1.csv'), _Upload(_csv_bytes([120]), 'S2.csv'), _Upload(_csv_bytes([130]), 'S2.csv'),
+               _csv_bytes([140, 150, 160]), b'not,a\nvalid,file']
+    samples = ingest_files(sources)
+    assert list(samples) == ['S1', 'S2', 'S2 (2)', 'sample_4', 'sample_5']
+    assert [list(c) for c in samples.values()] == [[100.0, 110.0], [120.0], [130.0], [140.0, 150.0, 160.0], []]
+
+    by_process = ingest_files(sources[:2], names=['x.csv', 'y.csv'], use_processes=True, workers=2)
+    assert list(by_process) == ['x', 'y'] and list(by_process['y']) == [120.0]
+
+
+def test_ingest_can_stream_text_files():
+    t = np.linspace(0.1, 1e3, 5_000)
+    data = pd.DataFrame({'Temp_0': 120, 'Time_0': t, 'Modulus_0': np.exp(-t / 50.0)}).to_csv(index=False).encode()
+    full = ingest_files([data], names=['a.csv'])['a']
+    streamed = ingest_files([data], names=['a.csv'], stream=True)['a']
+    assert list(streamed) == list(full) == [120.0]
+    assert len(streamed[120.0]) < len(full[120.0]) == 5_000
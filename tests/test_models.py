@@ -0,0 +1,60 @@
+"""
+Tests for can_relax.core.models
+
+Covers:
+- Analytic Jacobians agree with central finite differences
+- Initial guesses recover the shape of clean KWW / Dual KWW curves
+"""
+import numpy as np
+import pytest
+from can_relax.core.models import Maxwell, SingleKWW, DualKWW
+
+
+def _numeric_jac(func, t, params, rel_step=1e-6):
+    params = np.asarray(params, dtype=float)
+    cols = []
+    for k in range(len(params)):
+        h = rel_step * max(abs(params[k]), 1e-3)
+        up, down = params.copy(), params.copy()
+        up[k] += h
+        down[k] -= h
+        cols.append((func(t, *up) - func(t, *down)) / (2 * h))
+    return np.column_stack(cols)
+
+
+@pytest.mark.parametrize("model, params", [
+    (Maxwell(), [50.0]),
+    (SingleKWW(), [50.0, 0.6]),
+    (DualKWW(), [0.3, 5.0, 0.8, 400.0, 0.5]),
+])
+def test_analytic_jacobian_matches_finite_difference(model, params):
+    t = np.logspace(-2, 4, 120)
+    J = model.jac(t, *params)
+    assert J.shape == (len(t), len(params))
+    np.testing.assert_allclose(J, _numeric_jac(model.func, t, params), rtol=1e-4, atol=1e-8)
+
+
+def test_jacobian_finite_at_time_zero():
+    t = np.array([0.0, 0.01, 1.0])
+    assert np.all(np.isfinite(SingleKWW().jac(t, 10.0, 0.5)))
+    assert np.all(np.isfinite(DualKWW().jac(t, 0.5, 1.0, 0.7, 100.0, 0.4)))
+
+
+def test_kww_initial_guess_recovers_tau_and_beta():
+    t = np.logspace(-1, 4, 200)
+    tau, beta = SingleKWW().get_initial_guess(t, np.exp(-(t / 120.0) ** 0.6))
+    assert tau == pytest.approx(120.0, rel=1e-3)
+    assert beta == pytest.approx(0.6, rel=1e-3)
+
+
+def test_dual_kww_initial_guess_separates_modes():
+    t = np.logspace(-1, 5, 300)
+    model = DualKWW()
+    g = model.func(t, 0.4, 2.0, 0.9, 3000.0, 0.7)
+    A, tau1, beta1, tau2, beta2 = model.get_initial_guess(t, g)
+    assert A == pytest.approx(0.4, abs=0.1)
+    assert 0.5 < np.log10(tau2 / tau1) < 5
+    assert tau1 == pytest.approx(2.0, rel=0.5) and tau2 == pytest.approx(3000.0, rel=0.5)
+    # Never starts worse than the fixed-point guess it replaces
+    fixed = [0.5, t[len(t) // 4], 0.8, t[3 * len(t) // 4], 0.5]
+    assert np.sum((g - model.func(t, A, tau1, beta1, tau2, beta2)) ** 2) <= np.sum((g - model.func(t, *fixed)) ** 2)
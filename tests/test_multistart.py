@@ -0,0 +1,45 @@
+"""
+Tests for the multi-start Dual KWW fit (can_relax.core.multistart, CurveAnalyzer(multistart=True)).
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.models import DualKWW
+from can_relax.core.multistart import latin_hypercube_starts, multistart_fit
+
+
+def test_latin_hypercube_starts_cover_the_data_time_range():
+    t = np.logspace(-1, 3, 50)
+    starts = latin_hypercube_starts(DualKWW().get_bounds(), t, 40, seed=1)
+    assert starts.shape == (40, 5)
+    assert np.all((starts[:, 0] >= 0) & (starts[:, 0] <= 1))
+    taus = starts[:, [1, 3]]
+    assert taus.min() >= 1e-2 and taus.max() <= 1e4
+    # One sample per stratum: log-taus are spread over the whole range
+    assert np.ptp(np.log10(starts[:, 1])) > 4
+    np.testing.assert_array_equal(starts, latin_hypercube_starts(DualKWW().get_bounds(), t, 40, seed=1))
+
+
+def test_multistart_recovers_dual_kww_from_a_poor_guess():
+    model = DualKWW()
+    t = np.logspace(-1, 5, 200)
+    g = model.func(t, 0.35, 3.0, 0.9, 5000.0, 0.6)
+    popt, info = multistart_fit(model, t, g, p0=[0.5, 1e4, 0.3, 2e4, 0.3])
+    assert info['agreed'] and info['refined'] <= 5
+    fast = np.argmin([popt[1], popt[3]])
+    assert [popt[1], popt[3]][fast] == pytest.approx(3.0, rel=1e-3)
+    assert [popt[1], popt[3]][1 - fast] == pytest.approx(5000.0, rel=1e-3)
+
+
+def test_analyzer_multistart_option():
+    t = np.logspace(-1, 5, 200)
+    curves = {150.0: pd.DataFrame({'Time': t, 'Modulus': 1e6 * DualKWW().func(t, 0.35, 3.0, 0.9, 5000.0, 0.6)})}
+    analyzer = CurveAnalyzer(multistart=True)
+    one = analyzer.fit_one_temp(150.0, curves[150.0])
+    many = analyzer.fit_many(curves)[0]
+    for r in (one, many):
+        assert r['Best_Model'] == 'Dual_KWW'
+        assert 'multistart' in r['Fits']['Dual_KWW'] and 'multistart' not in r['Fits']['Single_KWW']
+    np.testing.assert_allclose(one['Fits']['Dual_KWW']['popt'], many['Fits']['Dual_KWW']['popt'])
+    assert analyzer._settings()['multistart'] is True
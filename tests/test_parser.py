@@ -23,3 +23,130 @@ def test_parse_wide_format_data_csv():
         assert list(df_100['Modulus']) == [1000.0, 500.0]
     finally:
         os.unlink(tmp_path)
+
+
+@pytest.mark.parametrize("sep, encoding", [(';', 'latin-1'), ('\t', 'utf-8-sig'), (',', 'utf-8')])
+def test_parse_sniffs_delimiter_and_encoding(sep, encoding):
+    header = sep.join(["Temp °C", "Time s", "Modulus MPa"])
+    rows = [sep.join(["130", str(t), str(m)]) for t, m in [(0.1, 2.0), (1.0, 1.5), (10.0, 0.7)]]
+    with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.csv') as tmp:
+        tmp.write("\n".join([header] + rows).encode(encoding))
+        tmp_path = tmp.name
+
+    try:
+        curves = parse_wide_format_data(tmp_path)
+        assert list(curves) == [130.0]
+        assert list(curves[130.0]['Modulus']) == [2.0, 1.5, 0.7]
+    finally:
+        os.unlink(tmp_path)
+
+
+def test_excel_content_with_csv_suffix_is_detected():
+    df = pd.DataFrame({'Temp': [110, 110], 'Time': [0.1, 1.0], 'Modulus': [3.0, 1.0]})
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx') as tmp:
+        xlsx_path = tmp.name
+    df.to_excel(xlsx_path, index=False)
+    tmp_path = xlsx_path[:-5] + '.csv'
+    os.replace(xlsx_path, tmp_path)
+
+    try:
+        curves = parse_wide_format_data(tmp_path)
+        assert list(curves[110.0]['Time']) == [0.1, 1.0]
+    finally:
+        os.unlink(tmp_path)
+
+
+def test_streaming_parse_matches_full_parse(tmp_path):
+    import numpy as np
+    from can_relax.core.analyzer import CurveAnalyzer
+    from can_relax.io.parser import parse_wide_format_streaming
+    t = np.linspace(0.01, 2e4, 50_000)
+    cols = {}
+    for i, (temp, tau) in enumerate([(120, 3000.0), (150, 300.0)]):
+        cols[f'Temp_{i}'] = f'{temp} °C'
+        cols[f'Time_{i}'] = t
+        cols[f'Modulus_{i}'] = 2.0 * np.exp(-(t / tau) ** 0.8)
+    cols['Comment'] = 'x'
+    path = tmp_path / 'long.csv'
+    pd.DataFrame(cols).to_csv(path, index=False)
+
+    streamed = parse_wide_format_streaming(str(path), chunksize=7_000, bins_per_decade=60)
+    assert list(streamed) == [120.0, 150.0]
+    assert len(streamed[120.0]) < 400
+    assert list(parse_wide_format_data(str(path), stream=True)) == [120.0, 150.0]
+
+    analyzer = CurveAnalyzer()
+    full = parse_wide_format_data(str(path), stream=False)
+    for temp in (120.0, 150.0):
+        a = analyzer.fit_one_temp(temp, streamed[temp], fit_model='Single_KWW')['Fits']['Single_KWW']['popt']
+        b = analyzer.fit_one_temp(temp, full[temp], fit_model='Single_KWW')['Fits']['Single_KWW']['popt']
+        np.testing.assert_allclose(a, b, rtol=0.05)
+
+
+def test_streaming_bins_follow_the_curve_start(tmp_path):
+    import numpy as np
+    from can_relax.core.analyzer import CurveAnalyzer
+    from can_relax.io.parser import parse_wide_format_streaming
+    # The test starts at 500 s; trim_curve shifts it to 0.01 s, so absolute-decade bins
+    # would average away the first decades of relaxation
+    t = 500.0 + np.linspace(0.0, 2e3, 40_000)
+    pd.DataFrame({'Temp': '140 °C', 'Time': t, 'Modulus': 2.0 * np.exp(-((t - 500.0) / 20.0) ** 0.7)}).to_csv(
+        tmp_path / 'late.csv', index=False)
+    streamed = parse_wide_format_streaming(str(tmp_path / 'late.csv'), chunksize=9_000)
+    full = parse_wide_format_data(str(tmp_path / 'late.csv'))
+    analyzer = CurveAnalyzer()
+    a = analyzer.fit_one_temp(140.0, streamed[140.0], fit_model='Single_KWW')['Fits']['Single_KWW']['popt']
+    b = analyzer.fit_one_temp(140.0, full[140.0], fit_model='Single_KWW')['Fits']['Single_KWW']['popt']
+    np.testing.assert_allclose(a, b, rtol=0.01)
+    np.testing.assert_allclose(a, [20.0, 0.7], rtol=0.02)
+
+
+def test_excel_selective_read_and_sheet_choice(tmp_path):
+    import numpy as np
+    from can_relax.io.parser import _read_excel_selective, list_excel_sheets
+    t = np.logspace(-1, 3, 40)
+    main = pd.DataFrame({'Sample': 'A', 'Temp 140': 140, 'Time (s)': t, 'Modulus (MPa)': np.exp(-t / 50),
+                         'Strain': 0.01, 'Normal force': 1.0, 'Temp 160': 160, 'Time.1': t, 'Modulus.1': np.exp(-t / 10)})
+    other = pd.DataFrame({'Temp': [180] * 5, 'Time': t[:5], 'Modulus': np.linspace(2, 1, 5)})
+    path = tmp_path / 'book.xlsx'
+    with pd.ExcelWriter(path) as writer:
+        main.to_excel(writer, sheet_name='Run', index=False)
+        other.to_excel(writer, sheet_name='Second', index=False)
+
+    assert list_excel_sheets(str(path)) == ['Run', 'Second']
+    df = _read_excel_selective(str(path))
+    assert 'Strain' not in df.columns and 'Normal force' not in df.columns
+    assert list(df.columns) == ['Temp 140', 'Time (s)', 'Modulus (MPa)', 'Temp 160', 'Time.1', 'Modulus.1']
+
+    curves = parse_wide_format_data(str(path))
+    assert list(curves) == [140.0, 160.0]
+    np.testing.assert_allclose(curves[160.0]['Modulus'], np.exp(-t / 10))
+    assert list(parse_wide_format_data(str(path), sheet_name='Second')) == [180.0]
+    assert list(parse_wide_format_data(str(path), sheet_name=1)) == [180.0]
+
+
+def test_block_index_resolution():
+    from can_relax.io.parser import _build_block_index, _identify_columns
+    cols = ['Temp A', 'Time A', 'Stress A', 'Modulus A', 'Temp B', 'Note', 'Temp C', 'Time C', 'Modulus C', 'Time D']
+    col_type, cols = _identify_columns(pd.DataFrame(columns=cols))
+    # A: first Time/Modulus inside its block; B: empty block, nearest neighbours (left wins ties)
+    assert _build_block_index(cols, col_type) == [(0, 1, 2), (4, 1, 3), (6, 7, 8)]
+
+
+def test_wide_sheet_with_hundreds_of_blocks():
+    import numpy as np
+    t = np.logspace(-1, 3, 50)
+    cols = {}
+    for b in range(150):
+        cols[f'Temp_{b}'] = 100 + b
+        cols[f'Time_{b}'] = t
+        cols[f'Modulus_{b}'] = np.exp(-t / (b + 1))
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as tmp:
+        tmp_path = tmp.name
+    pd.DataFrame(cols).to_csv(tmp_path, index=False)
+    try:
+        curves = parse_wide_format_data(tmp_path)
+        assert len(curves) == 150
+        np.testing.assert_allclose(curves[249.0]['Modulus'], np.exp(-t / 150))
+    finally:
+        os.unlink(tmp_path)
@@ -58,6 +58,15 @@ def test_time_starts_near_zero(processor):
     assert t_out[0] < 0.1  # time offset reset to 0.01
 
 
+def test_trim_reports_its_time_shift(processor):
+    t, g = _make_kww()
+    t_out, g_out, G0, shift = processor.trim_curve_with_shift(t + 500.0, g)
+    # raw time = trimmed time + shift, independently of any other trim in between
+    processor.trim_curve(t, g)
+    np.testing.assert_allclose(np.interp(t_out + shift, t + 500.0, g) / G0, g_out, rtol=1e-9)
+    assert processor.trim_curve_with_shift(t[:3], g[:3]) == (None, None, None, None)
+
+
 # ────────────────────────────────────────────────────────────────────
 # 2. Logarithmic downsampling
 # ────────────────────────────────────────────────────────────────────
@@ -152,3 +161,56 @@ def test_no_drift_keeps_full_length(processor):
     assert t_out[-1] >= 95.0
     # And have a reasonable number of points (log downsampled from 300 might be ~90)
     assert len(t_out) > 50
+
+
+# ────────────────────────────────────────────────────────────────────
+# 6. Configurable downsampling (target count and mode)
+# ────────────────────────────────────────────────────────────────────
+def test_max_points_is_configurable():
+    t, g = _make_kww(n=5000)
+    t_out, _, _ = DataProcessor(max_points=80).trim_curve(t, g)
+    assert len(t_out) <= 82
+    assert np.all(np.diff(t_out) > 0)
+
+
+def test_mean_mode_averages_noise():
+    rng = np.random.default_rng(0)
+    t, g = _make_kww(n=20000, t_max=1000.0)
+    g_noisy = g + rng.normal(0, 0.05, len(g))
+    proc_near = DataProcessor(downsample='nearest')
+    proc_mean = DataProcessor(downsample='mean')
+    t_n, g_n, G0_n = proc_near.trim_curve(t, g_noisy)
+    t_m, g_m, G0_m = proc_mean.trim_curve(t, g_noisy)
+    clean = lambda tt, G0: 2.5 * np.exp(-(((tt - 0.01 + t[0]) / 10.0) ** 0.5)) / G0
+    err_near = np.std(g_n[-100:] - clean(t_n[-100:], G0_n))
+    err_mean = np.std(g_m[-100:] - clean(t_m[-100:], G0_m))
+    assert err_mean < err_near
+    assert t_m[0] == pytest.approx(0.01)
+
+
+def test_invalid_downsample_mode():
+    with pytest.raises(ValueError):
+        DataProcessor(downsample='median')
+
+
+def test_log_bin_decimator_is_chunk_invariant_and_bounded():
+    from can_relax.core.processing import LogBinDecimator
+    rng = np.random.default_rng(0)
+    t = np.concatenate(([0.0], np.linspace(1e-3, 1e5, 200_000)))
+    g = np.exp(-t / 500.0) + 1e-3 + 1e-4 * rng.standard_normal(t.size)
+    g[10] = np.nan
+
+    whole = LogBinDecimator(bins_per_decade=50)
+    whole.update(t, g)
+    chunked = LogBinDecimator(bins_per_decade=50)
+    perm = rng.permutation(t.size)  # chunks need not be time-ordered
+    for part in np.array_split(perm, 7):
+        chunked.update(t[part], g[part])
+
+    tw, gw = whole.result()
+    tc, gc = chunked.result()
+    np.testing.assert_allclose(tc, tw, rtol=1e-12)
+    np.testing.assert_allclose(gc, gw, rtol=1e-12)
+    assert tw[0] == 0.0 and np.all(np.diff(tw) > 0)
+    assert len(whole) <= 50 * 9 + 1
+    assert whole.n_samples == t.size - 1
@@ -0,0 +1,63 @@
+"""
+Tests for the persistent fit-result cache (can_relax.core.result_cache).
+"""
+import pickle
+import numpy as np
+import pandas as pd
+import pytest
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.result_cache import ResultCache
+
+
+def _curve(tau=300.0):
+    t = np.logspace(0, 4, 100)
+    return pd.DataFrame({'Time': t, 'Modulus': np.exp(-(t / tau) ** 0.7)})
+
+
+def test_cached_result_survives_new_instances(tmp_path, monkeypatch):
+    path = tmp_path / 'cache.sqlite'
+    first = CurveAnalyzer(cache=ResultCache(path)).fit_one_temp(150.0, _curve(), fit_model='Single_KWW')
+
+    analyzer = CurveAnalyzer(cache=ResultCache(path))
+    monkeypatch.setattr(analyzer, '_fit_single', lambda *a: pytest.fail("cache miss: curve was refitted"))
+    second = analyzer.fit_one_temp(150.0, _curve(), fit_model='Single_KWW')
+    np.testing.assert_array_equal(second['Fits']['Single_KWW']['popt'], first['Fits']['Single_KWW']['popt'])
+
+
+def test_batched_and_single_paths_keep_separate_entries(tmp_path, monkeypatch):
+    path = tmp_path / 'cache.sqlite'
+    batched = CurveAnalyzer(cache=ResultCache(path)).fit_many({150.0: _curve()}, fit_model='Single_KWW')[0]
+
+    analyzer = CurveAnalyzer(cache=ResultCache(path))
+    calls = []
+    fit_single = analyzer._fit_single
+    monkeypatch.setattr(analyzer, '_fit_single', lambda *a: calls.append(a) or fit_single(*a))
+    analyzer.fit_one_temp(150.0, _curve(), fit_model='Single_KWW')
+    assert len(calls) == 1  # not served from the fit_many entry
+    monkeypatch.setattr(analyzer, '_fit_batch', lambda *a: pytest.fail("cache miss: curve was refitted"))
+    again = analyzer.fit_many({150.0: _curve()}, fit_model='Single_KWW')[0]
+    np.testing.assert_array_equal(again['Fits']['Single_KWW']['popt'], batched['Fits']['Single_KWW']['popt'])
+
+
+def test_key_depends_on_data_and_settings():
+    t = np.arange(5.0)
+    base = ResultCache.make_key(t, t, Tg=None, fit_model='Maxwell')
+    assert base == ResultCache.make_key(t.copy(), t.copy(), fit_model='Maxwell', Tg=None)
+    assert base != ResultCache.make_key(t, t + 1e-12, Tg=None, fit_model='Maxwell')
+    assert base != ResultCache.make_key(t, t, Tg=None, fit_model='Dual_KWW')
+
+
+def test_size_based_eviction(tmp_path):
+    cache = ResultCache(tmp_path / 'c.sqlite', max_bytes=30_000)
+    for i in range(10):
+        cache.put(f'k{i}', np.zeros(1000))  # ~8 kB each
+    assert cache.total_bytes() <= 30_000
+    assert cache.get('k9') is not None
+    assert cache.get('k0') is None
+
+
+def test_cache_is_picklable_for_worker_processes(tmp_path):
+    cache = ResultCache(tmp_path / 'c.sqlite')
+    cache.put('a', {'x': 1})
+    clone = pickle.loads(pickle.dumps(cache))
+    assert clone.get('a') == {'x': 1}
@@ -0,0 +1,86 @@
+"""
+Tests for binary session bundles (can_relax.io.session).
+"""
+import json
+import pathlib
+import numpy as np
+import pandas as pd
+import pytest
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.curve_set import CurveSet
+from can_relax.core.spectrum import SpectrumAnalyzer
+from can_relax.core.tts import TTSEngine
+from can_relax.io.session import MANIFEST, load_session, save_session
+
+
+@pytest.fixture
+def session_parts():
+    curves = {}
+    for temp, tau in [(120.0, 800.0), (140.0, 150.0), (160.0, 30.0)]:
+        t = np.logspace(-1, 4, 120)
+        curves[temp] = pd.DataFrame({'Time': t, 'Modulus': 1.5 * np.exp(-(t / tau) ** 0.8)})
+    curves = CurveSet.from_dict(curves)
+    results = CurveAnalyzer().fit_many(curves)
+    tau_grid, H = SpectrumAnalyzer().compute_continuous_spectrum(results[0]['Raw']['t'], results[0]['Raw']['g'], num_modes=20)
+    spectra = [{'Temp': 120.0, 'tau_grid': tau_grid, 'H': H}]
+    master = TTSEngine().generate_mastercurve(results)
+    return {'curves': curves, 'results': results, 'spectra': spectra, 'mastercurve': master, 'note': ('a', 1, None)}
+
+
+def test_round_trip_is_lazy_and_exact(tmp_path, session_parts):
+    save_session(tmp_path / 's', **session_parts)
+    assert len(list((tmp_path / 's').glob('blob_*.npy'))) <= 3
+    loaded = load_session(tmp_path / 's')
+
+    cs = loaded['curves']
+    assert isinstance(cs, CurveSet) and list(cs) == [120.0, 140.0, 160.0]
+    assert isinstance(cs.time.base, np.memmap) or isinstance(cs.time.base.base, np.memmap)
+    np.testing.assert_array_equal(cs.arrays(140.0)[1], session_parts['curves'].arrays(140.0)[1])
+    assert cs.fingerprint(160.0) == session_parts['curves'].fingerprint(160.0)
+
+    for got, want in zip(loaded['results'], session_parts['results']):
+        assert got['Temp'] == want['Temp'] and got['Best_Model'] == want['Best_Model']
+        assert got['Raw']['fingerprint'] == want['Raw']['fingerprint']
+        np.testing.assert_array_equal(got['Fits']['Dual_KWW']['popt'], want['Fits']['Dual_KWW']['popt'])
+        assert not got['Raw']['g'].flags.writeable
+    np.testing.assert_array_equal(loaded['spectra'][0]['H'], session_parts['spectra'][0]['H'])
+    assert loaded['mastercurve']['Shifts'] == session_parts['mastercurve']['Shifts']
+    assert loaded['note'] == ('a', 1, None)
+
+
+def test_resave_replaces_previous_session(tmp_path, session_parts):
+    save_session(tmp_path, **session_parts)
+    save_session(tmp_path, flags=np.array([True, False]))
+    assert list(load_session(tmp_path, mmap=False)) == ['flags']
+    blobs = [p.name for p in tmp_path.glob('blob_*.npy')]
+    assert len(blobs) == 1 and blobs[0].endswith('_bool.npy')
+    manifest = json.loads((tmp_path / MANIFEST).read_text())
+    manifest['format'] = 99
+    (tmp_path / MANIFEST).write_text(json.dumps(manifest))
+    with pytest.raises(ValueError):
+        load_session(tmp_path)
+
+
+def test_resave_over_a_mapped_session_keeps_it_intact(tmp_path, session_parts, monkeypatch):
+    save_session(tmp_path, **session_parts)
+    loaded = load_session(tmp_path)
+    old_blobs = {p.name for p in tmp_path.glob('blob_*.npy')}
+
+    # Windows refuses to delete a file that is memory-mapped
+    unlink = pathlib.Path.unlink
+    def locked_unlink(self, *args, **kwargs):
+        if self.name in old_blobs:
+            raise PermissionError(13, "file is in use", str(self))
+        return unlink(self, *args, **kwargs)
+    monkeypatch.setattr(pathlib.Path, 'unlink', locked_unlink)
+
+    save_session(tmp_path, curves=loaded['curves'], note='resaved')
+    resaved = load_session(tmp_path)
+    assert resaved['note'] == 'resaved'
+    np.testing.assert_array_equal(resaved['curves'].arrays(140.0)[1], session_parts['curves'].arrays(140.0)[1])
+    # The session that is still open keeps reading its own blobs
+    np.testing.assert_array_equal(loaded['results'][0]['Raw']['g'], session_parts['results'][0]['Raw']['g'])
+
+    monkeypatch.setattr(pathlib.Path, 'unlink', unlink)
+    save_session(tmp_path, note='again')
+    assert not old_blobs & {p.name for p in tmp_path.glob('blob_*.npy')}
@@ -0,0 +1,115 @@
+"""
+Tests for can_relax.core.spectrum.SpectrumAnalyzer
+
+Covers:
+- L-curve corner search (bounded number of solves, valid alpha)
+- Warm-started Tikhonov solve agrees with a cold solve
+- Solver backends (NNLS vs Ridge) and regularization operators
+- Kernel matrix / SVD cache
+"""
+import subprocess
+import sys
+import numpy as np
+import pytest
+from can_relax.core.spectrum import KernelCache, SpectrumAnalyzer
+
+
+def _dual_mode_curve(noise=0.01, n=250):
+    t = np.logspace(-2, 4, n)
+    g = 0.5 * np.exp(-(t / 3.0) ** 0.6) + 0.5 * np.exp(-(t / 500.0) ** 0.8)
+    return t, g + np.random.default_rng(0).normal(0, noise, n)
+
+
+def test_lcurve_search_is_grid_free():
+    t, g = _dual_mode_curve()
+    engine = SpectrumAnalyzer()
+    tau_grid, H = engine.compute_continuous_spectrum(t, g, num_modes=60, optimize_alpha=True)
+    assert len(H) == 60
+    assert np.all(H >= 0)
+    assert 1e-5 <= engine.last_alpha <= 1e2
+    # Far fewer solves than the former 40-point alpha grid
+    assert len(engine.last_lcurve['alpha']) < 30
+
+
+@pytest.mark.parametrize("alpha", [1e-4, 1e-2, 1.0])
+def test_warm_start_matches_cold_solve(alpha):
+    t, g = _dual_mode_curve()
+    tau = np.logspace(-3, 5, 40)
+    A = np.exp(-t[:, None] / tau[None, :])
+    engine = SpectrumAnalyzer()
+    cold = engine._solve_tikhonov(A, g, alpha, np.eye(40))
+    warm = engine._solve_tikhonov(A, g, alpha, np.eye(40), x0=engine._solve_tikhonov(A, g, alpha * 1.5, np.eye(40)))
+    objective = lambda H: np.sum((A @ H - g) ** 2) + alpha * H @ H
+    assert objective(warm) == pytest.approx(objective(cold), rel=1e-8)
+
+
+def test_nnls_reaches_lower_objective_than_ridge():
+    t, g = _dual_mode_curve()
+    engine = SpectrumAnalyzer()
+    tau, H_nnls = engine.compute_continuous_spectrum(t, g, alpha=0.01, subtract_G_eq=False)
+    _, H_ridge = engine.compute_continuous_spectrum(t, g, alpha=0.01, subtract_G_eq=False, solver='ridge')
+    A = np.exp(-t[:, None] / tau[None, :])
+    objective = lambda H: np.sum((A @ H - g) ** 2) + 0.01 * H @ H
+    assert objective(H_nnls) <= objective(H_ridge) * (1 + 1e-9)
+
+
+def test_second_derivative_regularization_is_smoother():
+    t, g = _dual_mode_curve(noise=0.02)
+    engine = SpectrumAnalyzer()
+    _, H_id = engine.compute_continuous_spectrum(t, g, num_modes=80, alpha=1e-3)
+    _, H_d2 = engine.compute_continuous_spectrum(t, g, num_modes=80, alpha=1e-3, regularization='second_derivative')
+    roughness = lambda H: np.sum(np.diff(H, 2) ** 2) / np.sum(H ** 2)
+    assert np.all(H_d2 >= 0)
+    assert roughness(H_d2) < roughness(H_id)
+
+
+def test_invalid_solver_options():
+    t, g = _dual_mode_curve()
+    engine = SpectrumAnalyzer()
+    with pytest.raises(ValueError):
+        engine.compute_continuous_spectrum(t, g, solver='lbfgs')
+    with pytest.raises(ValueError):
+        engine.compute_continuous_spectrum(t, g, solver='ridge', regularization='second_derivative')
+
+
+def test_default_solver_does_not_import_sklearn():
+    code = ("import sys, numpy as np; from can_relax.core.spectrum import SpectrumAnalyzer; "
+            "t = np.logspace(-2, 3, 100); SpectrumAnalyzer().compute_continuous_spectrum(t, np.exp(-t / 10), optimize_alpha=True); "
+            "sys.exit(1 if 'sklearn' in sys.modules else 0)")
+    assert subprocess.run([sys.executable, '-c', code]).returncode == 0
+
+
+def test_kernel_cache_reuses_and_evicts():
+    cache = KernelCache(max_bytes=3 * 100 * 50 * 8)
+    engine = SpectrumAnalyzer(kernel_cache=cache)
+    t, g = _dual_mode_curve(n=100)
+    engine.compute_continuous_spectrum(t, g, alpha=0.1)
+    engine.compute_continuous_spectrum(t, g, alpha=1.0)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    A = cache.kernel(t, np.logspace(-2, 4, 50))
+    assert not A.flags.writeable
+    U, s, Vt = cache.svd(t, np.logspace(-2, 4, 50))
+    np.testing.assert_allclose((U * s) @ Vt, A, atol=1e-10)
+    # Adding more grids than fit under the cap evicts the least recently used ones
+    for n_modes in (30, 40, 60):
+        cache.kernel(t, np.logspace(-2, 4, n_modes))
+    assert cache._nbytes <= cache.max_bytes
+
+
+def test_svd_lcurve_matches_explicit_tikhonov_norms():
+    t, g = _dual_mode_curve(noise=0.02)
+    engine = SpectrumAnalyzer(kernel_cache=KernelCache())
+    tau, H = engine.compute_continuous_spectrum(t, g, num_modes=40, optimize_alpha=True,
+                                                subtract_G_eq=False, fast_preview=True)
+    assert np.all(H >= 0)
+    assert 1e-5 <= engine.last_alpha <= 1e2
+
+    A = np.exp(-t[:, None] / tau[None, :])
+    curve = engine.last_lcurve
+    for k in (0, 100, 199):
+        a = curve['alpha'][k]
+        M = np.vstack([A, np.sqrt(a) * np.eye(40)])
+        H_free = np.linalg.lstsq(M, np.concatenate([g, np.zeros(40)]), rcond=None)[0]
+        assert curve['solution_norm'][k] == pytest.approx(np.linalg.norm(H_free), rel=1e-5)
+        assert curve['residual_norm'][k] == pytest.approx(np.linalg.norm(A @ H_free - g), rel=1e-5)
@@ -0,0 +1,79 @@
+"""
+Tests for residual weighting (CurveAnalyzer(weighting=...), models.LogResiduals).
+"""
+import logging
+import numpy as np
+import pandas as pd
+import pytest
+from can_relax.core.analyzer import CurveAnalyzer
+from can_relax.core.curve_set import CurveSet
+from can_relax.core.models import LogResiduals, SingleKWW
+from can_relax.io.session import load_session, save_session
+
+
+def _curve(tau=300.0, beta=0.5, n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.logspace(-1, 4, n)
+    g = np.exp(-(t / tau) ** beta) * (1 + 0.02 * rng.standard_normal(n))
+    return pd.DataFrame({'Time': t, 'Modulus': 1e6 * g})
+
+
+def test_unknown_weighting_is_rejected():
+    with pytest.raises(ValueError):
+        CurveAnalyzer(weighting='inverse')
+
+
+def test_log_residual_jacobian_is_chain_rule():
+    model, log_model = SingleKWW(), LogResiduals(SingleKWW())
+    t = np.logspace(-1, 3, 50)
+    np.testing.assert_allclose(log_model.func(t, 50.0, 0.6), np.log(model.func(t, 50.0, 0.6)))
+    np.testing.assert_allclose(log_model.jac(t, 50.0, 0.6), model.jac(t, 50.0, 0.6) / model.func(t, 50.0, 0.6)[:, None])
+
+
+@pytest.mark.parametrize("weighting", ['relative', 'log'])
+def test_weighted_batched_fit_matches_single_curve_fit(weighting):
+    curves = {150.0: _curve(seed=1), 160.0: _curve(tau=40.0, beta=0.7, seed=2)}
+    analyzer = CurveAnalyzer(weighting=weighting)
+    batched = analyzer.fit_many(curves, fit_model='Single_KWW')
+    for r in batched:
+        single = analyzer.fit_one_temp(r['Temp'], curves[r['Temp']], fit_model='Single_KWW')
+        np.testing.assert_allclose(r['Fits']['Single_KWW']['popt'], single['Fits']['Single_KWW']['popt'], rtol=1e-3)
+    uniform = CurveAnalyzer().fit_many(curves, fit_model='Single_KWW')
+    assert not np.allclose(uniform[0]['Fits']['Single_KWW']['popt'], batched[0]['Fits']['Single_KWW']['popt'])
+
+
+def test_sigma_column_down_weights_unreliable_points():
+    df = _curve(seed=3)
+    late = df['Time'] > 1000
+    df.loc[late, 'Modulus'] += 5e4  # baseline drift in the tail
+    df['Sigma'] = np.where(late, 1e6, 1e3)
+    tau_uniform = CurveAnalyzer().fit_one_temp(150.0, df, fit_model='Single_KWW')['Fits']['Single_KWW']['popt'][0]
+    result = CurveAnalyzer(weighting='sigma').fit_one_temp(150.0, df, fit_model='Single_KWW')
+    assert result['Raw']['sigma'].shape == result['Raw']['t'].shape
+    tau_sigma = result['Fits']['Single_KWW']['popt'][0]
+    assert abs(tau_sigma - 300.0) < abs(tau_uniform - 300.0)
+    assert tau_sigma == pytest.approx(300.0, rel=0.1)
+
+
+def test_sigma_survives_curve_set_and_session(tmp_path):
+    df = _curve(seed=4)
+    df['Sigma'] = np.where(df['Time'] > 1000, 1e6, 1e3)
+    curves = {150.0: df, 160.0: _curve(tau=40.0, seed=5)}
+    cs = CurveSet.from_dict(curves)
+    assert cs.sigmas(160.0) is None and 'Sigma' not in cs[160.0]
+    save_session(tmp_path, curves=cs)
+    loaded = load_session(tmp_path)['curves']
+    analyzer = CurveAnalyzer(weighting='sigma')
+    want = analyzer.fit_many(curves, fit_model='Single_KWW')[0]['Fits']['Single_KWW']['popt']
+    for packed in (cs, loaded):
+        got = analyzer.fit_many(packed, fit_model='Single_KWW')[0]['Fits']['Single_KWW']['popt']
+        np.testing.assert_allclose(got, want)
+    unweighted = CurveAnalyzer().fit_many(curves, fit_model='Single_KWW')[0]['Fits']['Single_KWW']['popt']
+    assert not np.allclose(want, unweighted)
+
+
+def test_sigma_weighting_without_sigma_column_warns(caplog):
+    with caplog.at_level(logging.WARNING, logger="Analyzer"):
+        result = CurveAnalyzer(weighting='sigma').fit_one_temp(150.0, _curve(seed=6), fit_model='Single_KWW')
+    assert 'sigma' not in result['Raw']
+    assert "no 'Sigma' column" in caplog.text